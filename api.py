@@ -1,258 +1,454 @@
-from adafruit_requests import Session
-from socketpool import SocketPool
-from ssl import create_default_context
-import json
-
-# ESPN API websites
-mlb_url = "http://site.api.espn.com/apis/site/v2/sports/baseball/mlb/scoreboard"
-nba_url = "http://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-nfl_url = "http://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
-ncaab_url = "http://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard"
-cfb_url = "http://site.api.espn.com/apis/site/v2/sports/football/college-football/scoreboard"
-
-def extract_baseball(pool):
-    baseball_games = []
-    requests = Session(pool, create_default_context())
-    
-    try:
-        print("Requesting from API...")
-        response = requests.get(mlb_url)
-    except:
-        print("Website does not work....")
-        return
-
-    json_response = response.json()
-
-    for i in range(len(json_response["events"])): # len(json_response["events"])
-        game = json_response["events"][i]
-        
-        home_team = game["competitions"][0]["competitors"][0]["team"]["abbreviation"]
-        away_team = game["competitions"][0]["competitors"][1]["team"]["abbreviation"]
-        home_color_main = game["competitions"][0]["competitors"][0]["team"].get("color", '000000')
-        home_color_alt = game["competitions"][0]["competitors"][0]["team"].get("alternateColor", '000000')
-        away_color_main = game["competitions"][0]["competitors"][1]["team"].get("color", '000000')
-        away_color_alt = game["competitions"][0]["competitors"][1]["team"].get("alternateColor", '000000')     
-        home_score = game["competitions"][0]["competitors"][0]["score"]
-        away_score = game["competitions"][0]["competitors"][1]["score"]
-        inning = game["competitions"][0]["status"]["type"].get("shortDetail", "0")
-        
-        if "situation" in game["competitions"][0]:
-            first = game["competitions"][0]["situation"].get("onFirst", False)
-            second = game["competitions"][0]["situation"].get("onSecond", False)
-            third = game["competitions"][0]["situation"].get("onThird", False)
-            balls = game["competitions"][0]["situation"].get("balls", 0)
-            strikes = game["competitions"][0]["situation"].get("strikes", 0)
-            outs = game["competitions"][0]["situation"].get("outs", 0)
-        else:
-            first = second = third = False
-            balls = strikes = outs = 0
-
-        baseball_game_dict = {
-            "HOME": home_team,
-            "AWAY": away_team,
-            "HOME_COLOR_MAIN" : home_color_main,
-            "HOME_COLOR_ALT" : home_color_alt,
-            "AWAY_COLOR_MAIN" : away_color_main,
-            "AWAY_COLOR_ALT": away_color_alt,
-            "HOME_SCORE": home_score,
-            "AWAY_SCORE": away_score,
-            "INNING": inning,
-            "ON_FIRST": first,
-            "ON_SECOND": second,
-            "ON_THIRD": third,
-            "BALLS" : balls,
-            "STRIKES" : strikes,
-            "OUTS" : outs
-        }
-        baseball_games.append(baseball_game_dict)
-
-    with open("baseball.json", "w") as f2:
-        json.dump(baseball_games, f2)
-    f2.close()
-    return baseball_games
-
-def extract_basketball(pool):
-    basketball_games = []
-    requests = Session(pool, create_default_context())
-    
-    try:
-        print("Requesting Basketball Games...")
-        response = requests.get(nba_url)
-    except:
-        print("Website does not work....")
-        return
-
-    json_response = response.json()
-
-    for i in range(len(json_response["events"])): # len(json_response["events"])
-        game = json_response["events"][i]
-        home_team = game["competitions"][0]["competitors"][0]["team"]["abbreviation"]
-        away_team = game["competitions"][0]["competitors"][1]["team"]["abbreviation"]
-        home_color_main = game["competitions"][0]["competitors"][0]["team"].get("color", '000000')
-        home_color_alt = game["competitions"][0]["competitors"][0]["team"].get("alternateColor", '000000')
-        away_color_main = game["competitions"][0]["competitors"][1]["team"].get("color", '000000')
-        away_color_alt = game["competitions"][0]["competitors"][1]["team"].get("alternateColor", '000000')
-        home_score = game["competitions"][0]["competitors"][0]["score"]
-        away_score = game["competitions"][0]["competitors"][1]["score"]
-        quarter = game["competitions"][0]["status"]["period"]
-        finished = game["competitions"][0]["status"]["type"]["completed"]
-       
-        basketball_game_dict = {
-            "HOME": home_team,
-            "AWAY": away_team,
-            "HOME_COLOR_MAIN" : home_color_main,
-            "HOME_COLOR_ALT" : home_color_alt,
-            "AWAY_COLOR_MAIN" : away_color_main,
-            "AWAY_COLOR_ALT": away_color_alt,
-            "HOME_SCORE": home_score,
-            "AWAY_SCORE": away_score,
-            "QUARTER": quarter,
-            "FINISHED": finished
-        }
-
-        # print(basketball_game_dict)
-        basketball_games.append(basketball_game_dict)
-
-    with open("basketball.json", "w") as f2:
-        json.dump(basketball_games, f2)
-    f2.close()
-    return basketball_games
-
-def extract_ncaab(pool):
-    ncaab_games = []
-    requests = Session(pool, create_default_context())
-    
-    try:
-        print("Requesting Basketball Games...")
-        response = requests.get(ncaab_url)
-    except:
-        print("Website does not work....")
-        return
-
-    json_response = response.json()
-
-    for i in range(len(json_response["events"])): # len(json_response["events"])
-        game = json_response["events"][i]
-        home_team = game["competitions"][0]["competitors"][0]["team"]["abbreviation"]
-        away_team = game["competitions"][0]["competitors"][1]["team"]["abbreviation"]
-        home_color_main = game["competitions"][0]["competitors"][0]["team"].get("color", '000000')
-        home_color_alt = game["competitions"][0]["competitors"][0]["team"].get("alternateColor", '000000')
-        away_color_main = game["competitions"][0]["competitors"][1]["team"].get("color", '000000')
-        away_color_alt = game["competitions"][0]["competitors"][1]["team"].get("alternateColor", '000000')
-        home_score = game["competitions"][0]["competitors"][0]["score"]
-        away_score = game["competitions"][0]["competitors"][1]["score"]
-        quarter = game["competitions"][0]["status"]["period"]
-        finished = game["competitions"][0]["status"]["type"]["completed"]
-       
-        ncaab_game_dict = {
-            "HOME": home_team,
-            "AWAY": away_team,
-            "HOME_COLOR_MAIN" : home_color_main,
-            "HOME_COLOR_ALT" : home_color_alt,
-            "AWAY_COLOR_MAIN" : away_color_main,
-            "AWAY_COLOR_ALT": away_color_alt,
-            "HOME_SCORE": home_score,
-            "AWAY_SCORE": away_score,
-            "QUARTER": quarter,
-            "FINISHED": finished
-        }
-
-        # print(basketball_game_dict)
-        ncaab_games.append(ncaab_game_dict)
-
-    with open("ncaab.json", "w") as f2:
-        json.dump(ncaab_games, f2)
-    f2.close()
-    return ncaab_games
-
-def extract_football(pool):
-    football_games = []
-    requests = Session(pool, create_default_context())
-    
-    try:
-        response = requests.get(nfl_url)
-    except:
-        print("Website does not work....")
-        return
-
-    json_response = response.json()
-
-    for i in range(len(json_response["events"])): # len(json_response["events"])
-        game = json_response["events"][i]
-        home_team = game["competitions"][0]["competitors"][0]["team"].get("abbreviation", "N/A")
-        away_team = game["competitions"][0]["competitors"][1]["team"].get("abbreviation", "N/A")
-        home_color_main = game["competitions"][0]["competitors"][0]["team"].get("color", 'ff0000')
-        home_color_alt = game["competitions"][0]["competitors"][0]["team"].get("alternateColor", '000000')
-        away_color_main = game["competitions"][0]["competitors"][1]["team"].get("color", '0000ff')
-        away_color_alt = game["competitions"][0]["competitors"][1]["team"].get("alternateColor", '000000')
-        home_score = game["competitions"][0]["competitors"][0].get("score", "N/A")
-        away_score = game["competitions"][0]["competitors"][1].get("score", "N/A")
-        quarter = game["competitions"][0]["status"].get("period", "N/A")
-        finished = game["competitions"][0]["status"]["type"].get("completed", False)
-   
-        football_game_dict = {
-            "HOME": home_team,
-            "AWAY": away_team,
-            "HOME_COLOR_MAIN" : home_color_main,
-            "HOME_COLOR_ALT" : home_color_alt,
-            "AWAY_COLOR_MAIN" : away_color_main,
-            "AWAY_COLOR_ALT": away_color_alt,
-            "HOME_SCORE": home_score,
-            "AWAY_SCORE": away_score,
-            "QUARTER": quarter,
-            "FINISHED": finished
-        }
-       
-        football_games.append(football_game_dict)
-   
-    with open("football.json", "w") as f2:
-        json.dump(football_games, f2)
-    
-    f2.close()
-    return football_games
-
-def extract_cfb(pool):
-    football_games = []
-    requests = Session(pool, create_default_context())
-    
-    try:
-        response = requests.get(cfb_url)
-    except:
-        print("Website does not work....")
-        return
-
-    json_response = response.json()
-
-    for i in range(len(json_response["events"])): # len(json_response["events"])
-        game = json_response["events"][i]
-        home_team = game["competitions"][0]["competitors"][0]["team"].get("abbreviation", "N/A")
-        away_team = game["competitions"][0]["competitors"][1]["team"].get("abbreviation", "N/A")
-        home_color_main = game["competitions"][0]["competitors"][0]["team"].get("color", 'ff0000')
-        home_color_alt = game["competitions"][0]["competitors"][0]["team"].get("alternateColor", '000000')
-        away_color_main = game["competitions"][0]["competitors"][1]["team"].get("color", '0000ff')
-        away_color_alt = game["competitions"][0]["competitors"][1]["team"].get("alternateColor", '000000')
-        home_score = game["competitions"][0]["competitors"][0].get("score", "N/A")
-        away_score = game["competitions"][0]["competitors"][1].get("score", "N/A")
-        quarter = game["competitions"][0]["status"].get("period", "N/A")
-        finished = game["competitions"][0]["status"]["type"].get("completed", False)
-   
-        football_game_dict = {
-            "HOME": home_team,
-            "AWAY": away_team,
-            "HOME_COLOR_MAIN" : home_color_main,
-            "HOME_COLOR_ALT" : home_color_alt,
-            "AWAY_COLOR_MAIN" : away_color_main,
-            "AWAY_COLOR_ALT": away_color_alt,
-            "HOME_SCORE": home_score,
-            "AWAY_SCORE": away_score,
-            "QUARTER": quarter,
-            "FINISHED": finished
-        }
-       
-        football_games.append(football_game_dict)
-   
-    with open("cfb.json", "w") as f2:
-        json.dump(football_games, f2)
-    
-    f2.close()
-    return football_games
\ No newline at end of file
+from adafruit_requests import Session
+from ssl import create_default_context
+from binascii import crc32
+import asyncio
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff, ticks_less
+from jsonstream import compile_paths, parse
+from records import Game
+from status import parse_date
+import snapshot
+
+# ESPN API websites
+mlb_url = "http://site.api.espn.com/apis/site/v2/sports/baseball/mlb/scoreboard"
+nba_url = "http://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+nfl_url = "http://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
+ncaab_url = "http://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard"
+cfb_url = "http://site.api.espn.com/apis/site/v2/sports/football/college-football/scoreboard"
+
+# Bytes read off the socket per step while parsing a scoreboard
+CHUNK_SIZE = 512
+
+# Field tables. Each entry is (record key, ESPN field name, default). Team and
+# competitor keys are prefixed with HOME/AWAY by the extraction engine.
+_TEAM = (
+    ("", "abbreviation", "N/A"),
+    ("_COLOR_MAIN", "color", "000000"),
+    ("_COLOR_ALT", "alternateColor", "000000"),
+)
+_COMPETITOR = (
+    ("_SCORE", "score", "N/A"),
+)
+_PERIOD = (
+    ("QUARTER", "period", 0),
+    ("CLOCK", "clock", 0),
+)
+_COMPLETED = (
+    ("STATE", "state", "pre"),
+    ("FINISHED", "completed", False),
+    ("NOTE", "name", ""),
+)
+
+# One entry per league: scoreboard URL, offline snapshot file, the period in
+# which a game is "near the end" for the poll scheduler, and the fields to
+# pull out of each game. "defaults" overrides a default for one side only.
+# Adding a league (NHL, WNBA, MLS...) is a new entry here.
+LEAGUES = {
+    "mlb": {
+        "url": mlb_url,
+        "final_period": 9,
+        "file": "baseball.snap",
+        "team": _TEAM,
+        "competitor": _COMPETITOR,
+        "status": _PERIOD,
+        "status_type": (
+            ("STATE", "state", "pre"),
+            ("FINISHED", "completed", False),
+            ("NOTE", "name", ""),
+            # Only its first word is kept: the inning half
+            ("HALF", "shortDetail", ""),
+        ),
+        "situation": (
+            ("ON_FIRST", "onFirst", False),
+            ("ON_SECOND", "onSecond", False),
+            ("ON_THIRD", "onThird", False),
+            ("BALLS", "balls", 0),
+            ("STRIKES", "strikes", 0),
+            ("OUTS", "outs", 0),
+        ),
+    },
+    "nba": {
+        "url": nba_url,
+        "final_period": 4,
+        "file": "basketball.snap",
+        "team": _TEAM,
+        "competitor": _COMPETITOR,
+        "status": _PERIOD,
+        "status_type": _COMPLETED,
+    },
+    "ncaab": {
+        "url": ncaab_url,
+        "final_period": 2,
+        "file": "ncaab.snap",
+        "team": _TEAM,
+        "competitor": _COMPETITOR,
+        "status": _PERIOD,
+        "status_type": _COMPLETED,
+    },
+    "nfl": {
+        "url": nfl_url,
+        "final_period": 4,
+        "file": "football.snap",
+        "team": _TEAM,
+        "competitor": _COMPETITOR,
+        "status": _PERIOD,
+        "status_type": _COMPLETED,
+        "defaults": {"HOME_COLOR_MAIN": "ff0000", "AWAY_COLOR_MAIN": "0000ff"},
+    },
+    "cfb": {
+        "url": cfb_url,
+        "final_period": 4,
+        "file": "cfb.snap",
+        "team": _TEAM,
+        "competitor": _COMPETITOR,
+        "status": _PERIOD,
+        "status_type": _COMPLETED,
+        "defaults": {"HOME_COLOR_MAIN": "ff0000", "AWAY_COLOR_MAIN": "0000ff"},
+    },
+}
+
+_COMPETITION = "events.*.competitions.0."
+
+# Compiled per-league plans, built on first use
+_plans = {}
+
+def _with_side(fields, side, defaults):
+    return tuple(
+        (side + key, name, defaults.get(side + key, default))
+        for key, name, default in fields
+    )
+
+def _plan(league):
+    """Resolve a LEAGUES entry once: final record keys and defaults per side,
+    plus the stream parser whitelist covering exactly those fields."""
+    plan = _plans.get(league)
+    if plan is not None:
+        return plan
+    spec = LEAGUES[league]
+    defaults = spec.get("defaults", {})
+    situation = spec.get("situation", ())
+
+    paths = ["events.*.id", "events.*.date"]
+    for _, name, _ in spec["team"]:
+        paths.append(_COMPETITION + "competitors.*.team." + name)
+    for _, name, _ in spec["competitor"]:
+        paths.append(_COMPETITION + "competitors.*." + name)
+    for _, name, _ in spec["status"]:
+        paths.append(_COMPETITION + "status." + name)
+    for _, name, _ in spec["status_type"]:
+        paths.append(_COMPETITION + "status.type." + name)
+    for _, name, _ in situation:
+        paths.append(_COMPETITION + "situation." + name)
+
+    home_team = _with_side(spec["team"], "HOME", defaults)
+    away_team = _with_side(spec["team"], "AWAY", defaults)
+    home = _with_side(spec["competitor"], "HOME", defaults)
+    away = _with_side(spec["competitor"], "AWAY", defaults)
+    # Fields that change during a game; they feed the DIGEST of a record
+    live = [key for fields in (home, away, spec["status"], spec["status_type"], situation)
+            for key, _, _ in fields]
+
+    plan = {
+        "home_team": home_team,
+        "away_team": away_team,
+        "home": home,
+        "away": away,
+        "status": spec["status"],
+        "status_type": spec["status_type"],
+        "situation": situation,
+        "paths": compile_paths(paths),
+        "live": tuple(live),
+        # Every key a record of this league carries, shared by all of them
+        "keys": tuple(["ID", "START"] + [key for key, _, _ in home_team + away_team] + live + ["DIGEST"]),
+    }
+    _plans[league] = plan
+    return plan
+
+def _pick(source, fields, record):
+    for key, name, default in fields:
+        record[key] = source.get(name, default)
+
+_EMPTY = {}
+
+def _extract_game(plan, game):
+    # Every container is looked up once per game, not once per field
+    competition = game["competitions"][0]
+    home, away = competition["competitors"][0], competition["competitors"][1]
+    status = competition.get("status", _EMPTY)
+
+    record = Game(plan["keys"])
+    record["ID"] = game.get("id")
+    record["START"] = parse_date(game.get("date"))
+    _pick(home.get("team", _EMPTY), plan["home_team"], record)
+    _pick(away.get("team", _EMPTY), plan["away_team"], record)
+    _pick(home, plan["home"], record)
+    _pick(away, plan["away"], record)
+    _pick(status, plan["status"], record)
+    _pick(status.get("type", _EMPTY), plan["status_type"], record)
+    _pick(competition.get("situation", _EMPTY), plan["situation"], record)
+    record["DIGEST"] = digest(record, plan["live"])
+    return record
+
+def digest(record, keys):
+    """CRC32 over the given fields of a game record. Two polls of the same
+    game with the same digest need no redraw."""
+    return crc32("|".join(str(record[key]) for key in keys).encode()) & 0x3FFFFFFF
+
+# Shared HTTP session. adafruit_requests keeps one keep-alive socket per
+# (host, port, proto) inside a Session, so reusing it means every league on
+# site.api.espn.com shares a single connection instead of opening a new socket
+# and TLS context on every poll.
+_session = None
+
+def get_session(pool):
+    global _session
+    if _session is None:
+        _session = Session(pool, create_default_context())
+    return _session
+
+def close_session():
+    """Close every socket held by the shared session and forget it.
+
+    Call this whenever the radio reconnects; the old sockets are dead.
+    """
+    global _session
+    if _session is None:
+        return
+    for sock in list(_session._open_sockets.values()):
+        try:
+            _session._close_socket(sock)
+        except Exception:
+            pass
+    _session = None
+
+def fetch(pool, url, headers=None):
+    """GET url on the shared session. On any socket error the session is torn
+    down so the next poll starts from a fresh connection."""
+    try:
+        return get_session(pool).get(url, headers=headers, stream=True)
+    except Exception:
+        close_session()
+        raise
+
+# HTTP cache validators per scoreboard URL: ETag, Last-Modified, when the
+# Cache-Control max-age runs out (ticks_ms) and the games parsed from the last
+# full response.
+_http_cache = {}
+
+def _max_age(cache_control):
+    """Seconds from a Cache-Control header, or None when it can't be cached."""
+    if not cache_control or "no-store" in cache_control or "no-cache" in cache_control:
+        return None
+    for directive in cache_control.split(","):
+        directive = directive.strip()
+        if directive.startswith("max-age="):
+            try:
+                return int(directive[8:])
+            except ValueError:
+                return None
+    return None
+
+def _remember(url, headers, games):
+    entry = _http_cache.get(url)
+    if entry is None:
+        entry = _http_cache[url] = {"etag": None, "last_modified": None, "expires": None, "games": None}
+    if games is not None:
+        entry["games"] = games
+        entry["etag"] = headers.get("etag")
+        entry["last_modified"] = headers.get("last-modified")
+    max_age = _max_age(headers.get("cache-control"))
+    if max_age:
+        entry["expires"] = ticks_add(ticks_ms(), max_age * 1000)
+    else:
+        entry["expires"] = None
+
+def _conditional_headers(entry):
+    headers = {}
+    if entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def load_snapshot(league):
+    """Return the games from the last successful extract() of league, from RAM
+    when they have not reached flash yet, or None when there are none."""
+    path = LEAGUES[league]["file"]
+    games = snapshot.pending(path)
+    if games is not None:
+        return games
+    try:
+        return snapshot.load(path)
+    except (OSError, ValueError) as e:
+        # No snapshot yet, or one from an older format
+        print("No snapshot for", league, e)
+        return None
+
+def extract(pool, league):
+    """Fetch, parse and save the scoreboard of league (a LEAGUES key).
+
+    Returns the list of game dicts, or None when the request fails. While the
+    server's max-age is unexpired, or when it answers 304 Not Modified, the
+    games parsed last time are returned as-is without touching the parser.
+    """
+    plan = _plan(league)
+    url = LEAGUES[league]["url"]
+
+    entry = _http_cache.get(url)
+    headers = None
+    if entry is not None and entry["games"] is not None:
+        if entry["expires"] is not None and ticks_less(ticks_ms(), entry["expires"]):
+            return entry["games"]
+        headers = _conditional_headers(entry)
+
+    try:
+        print("Requesting " + league + " games...")
+        response = fetch(pool, url, headers)
+    except:
+        print("Website does not work....")
+        return
+
+    if response.status_code == 304:
+        response.close()
+        _remember(url, response.headers, None)
+        return entry["games"]
+    if response.status_code != 200:
+        print("Bad response: " + str(response.status_code))
+        response.close()
+        return
+
+    try:
+        json_response = parse(response.iter_content(CHUNK_SIZE), plan["paths"])
+        response.close()
+    except Exception:
+        close_session()
+        raise
+
+    games = []
+    for game in json_response.get("events", ()):
+        games.append(_extract_game(plan, game))
+    _remember(url, response.headers, games)
+
+    snapshot.store(LEAGUES[league]["file"], games)
+    snapshot.flush()
+    return games
+
+# Result of diff() when a poll changed nothing
+NO_CHANGES = {"added": (), "removed": (), "changed": {}}
+
+def diff(old_games, new_games):
+    """Structured delta between two snapshots of one league, keyed by ESPN
+    event id rather than list position:
+
+        {"added": [id, ...], "removed": [id, ...], "changed": {id: [key, ...]}}
+
+    Only games whose DIGEST moved are compared field by field.
+    """
+    old_by_id = {}
+    for game in old_games or ():
+        old_by_id[game.get("ID")] = game
+
+    added = []
+    changed = {}
+    for game in new_games:
+        game_id = game.get("ID")
+        previous = old_by_id.pop(game_id, None)
+        if previous is None:
+            added.append(game_id)
+        elif previous.get("DIGEST") != game.get("DIGEST"):
+            changed[game_id] = [key for key in game if key != "DIGEST" and previous.get(key) != game[key]]
+    return {"added": added, "removed": list(old_by_id), "changed": changed}
+
+# Last snapshot handed out by poll(), per league. This doubles as the warm
+# in-memory league cache that the background prefetcher keeps filled.
+_previous = {}
+# ticks_ms() of the last successful poll(), per league
+_polled_at = {}
+
+def poll(pool, league):
+    """extract() plus the diff() against the previous poll of the same league.
+
+    Returns (games, delta), or (None, None) when the request fails.
+    """
+    games = extract(pool, league)
+    if games is None:
+        return None, None
+    previous = _previous.get(league)
+    if games is previous:
+        delta = NO_CHANGES
+    else:
+        delta = diff(previous, games)
+    _previous[league] = games
+    _polled_at[league] = ticks_ms()
+    return games, delta
+
+def cached(league):
+    """Games from the last successful poll() of league, or None."""
+    return _previous.get(league)
+
+def cache_age(league):
+    """Seconds since the last successful poll() of league, or None."""
+    polled_at = _polled_at.get(league)
+    if polled_at is None:
+        return None
+    return ticks_diff(ticks_ms(), polled_at) // 1000
+
+# Seconds a successful poll is served to other callers without refetching
+FRESH_FOR = 5
+
+# league -> {"done": asyncio.Event, "result": (games, delta)} while a
+# refresh() of that league is in progress
+_in_flight = {}
+
+async def refresh(pool, league, max_age=FRESH_FOR):
+    """Single-flight poll() for use from tasks.
+
+    A result younger than max_age seconds is returned from the cache with
+    NO_CHANGES. If another task is already refreshing league, this waits for
+    that request and shares its result instead of starting a second one.
+    Returns (games, delta), or (None, None) when the request fails.
+    """
+    age = cache_age(league)
+    if age is not None and age < max_age:
+        return cached(league), NO_CHANGES
+
+    flight = _in_flight.get(league)
+    if flight is not None:
+        await flight["done"].wait()
+        return flight["result"]
+
+    flight = {"done": asyncio.Event(), "result": (None, None)}
+    _in_flight[league] = flight
+    try:
+        # Let callers arriving in the same turn of the loop join this flight
+        await asyncio.sleep(0)
+        flight["result"] = poll(pool, league)
+    except Exception as e:
+        print("Refresh failed:", league, e)
+    finally:
+        del _in_flight[league]
+        flight["done"].set()
+    return flight["result"]
+
+def index_of(games, game_id, default=0):
+    """Position of the game with ESPN event id game_id in games. Falls back to
+    default (clamped to the list) when the game is gone."""
+    if game_id is not None:
+        for i in range(len(games)):
+            if games[i].get("ID") == game_id:
+                return i
+    return min(default, len(games) - 1)
+
+def extract_baseball(pool):
+    return extract(pool, "mlb")
+
+def extract_basketball(pool):
+    return extract(pool, "nba")
+
+def extract_ncaab(pool):
+    return extract(pool, "ncaab")
+
+def extract_football(pool):
+    return extract(pool, "nfl")
+
+def extract_cfb(pool):
+    return extract(pool, "cfb")
@@ -0,0 +1,96 @@
+import json
+from displayio import OnDiskBitmap, TileGrid, ColorConverter
+
+# Bitmap registry.
+#
+# Every icon is opened once, by load() at start-up, and the OnDiskBitmap (and
+# the file handle it reads from) is kept for the life of the program. Screens
+# ask for TileGrids by key and get the same TileGrid for a key every time, so
+# building a screen touches neither the filesystem nor the heap twice. A
+# TileGrid can only be in one group at a time, so each key belongs to one
+# scene (see scenes.py).
+#
+# The small status icons (period, inning half, bases) live on one sprite
+# sheet built by tools/pack_sprites.py. A sprite TileGrid shows one tile of
+# the sheet, and switching icons is a single tile index write.
+
+PATH = "bitmaps/%s.bmp"
+SHEET = "sprites"
+MANIFEST = "bitmaps/sprites.json"
+
+NAMES = (
+    "wifi_small", "api",
+    "nfl", "mlb", "nba", "ncaab", "cfb",
+    "basketball", "fball",
+    SHEET,
+)
+
+# name -> OnDiskBitmap
+_bitmaps = {}
+# key -> TileGrid
+_tilegrids = {}
+# sprite name -> (tile width, tile height, tile index)
+_sprites = {}
+
+
+def load(names=NAMES):
+    with open(MANIFEST) as f:
+        for name, tile in json.load(f).items():
+            _sprites[name] = tuple(tile)
+    for name in names:
+        bitmap(name)
+
+
+def bitmap(name):
+    bmp = _bitmaps.get(name)
+    if bmp is None:
+        bmp = _bitmaps[name] = OnDiskBitmap(open(PATH % name, "rb"))
+    return bmp
+
+
+def tilegrid(key, name, x, y):
+    """The shared TileGrid for key, showing bitmap name at (x, y)."""
+    bmp = bitmap(name)
+    grid = _tilegrids.get(key)
+    if grid is None:
+        grid = _tilegrids[key] = TileGrid(
+            bmp,
+            pixel_shader=getattr(bmp, 'pixel_shader', ColorConverter()),
+            tile_width=bmp.width,
+            tile_height=bmp.height,
+        )
+    elif grid.bitmap is not bmp:
+        grid.bitmap = bmp
+    grid.x = x
+    grid.y = y
+    return grid
+
+
+def sprite(key, name, x, y):
+    """The shared TileGrid for key, showing sprite name at (x, y). Every
+    sprite it later shows must have the same size."""
+    width, height, index = _sprites[name]
+    grid = _tilegrids.get(key)
+    if grid is None:
+        sheet = bitmap(SHEET)
+        grid = _tilegrids[key] = TileGrid(
+            sheet,
+            pixel_shader=getattr(sheet, 'pixel_shader', ColorConverter()),
+            tile_width=width,
+            tile_height=height,
+            default_tile=index,
+        )
+    grid.x = x
+    grid.y = y
+    grid[0] = index
+    return grid
+
+
+def set_sprite(grid, name):
+    """Show sprite name on grid; returns whether the tile changed."""
+    index = _sprites[name][2]
+    if grid[0] == index:
+        return False
+    grid[0] = index
+    return True
+
@@ -0,0 +1,112 @@
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+# Button input on top of keypad.Keys.
+#
+# keypad scans the pins in the background, debounces them and queues
+# press/release events, so a press is never lost while the event loop is busy
+# (e.g. during a blocking fetch). Buttons turns that queue into gestures:
+#
+#   PRESS   on key-down, or on release for keys listed in long_keys when
+#           released before long_press seconds
+#   LONG    once, after a key in long_keys has been held for long_press
+#           seconds (no PRESS follows)
+#   REPEAT  every repeat_rate seconds after repeat_delay while held
+#           (only for keys listed in repeat_keys)
+
+PRESS = 0
+LONG = 1
+REPEAT = 2
+
+
+class Buttons:
+    def __init__(self, keys, repeat_keys=(), long_keys=(), long_press=0.8,
+                 repeat_delay=0.5, repeat_rate=0.15):
+        """keys is a keypad.Keys (or FakeKeys) instance."""
+        self._keys = keys
+        self._repeat_keys = repeat_keys
+        self._long_keys = long_keys
+        self.long_press = long_press
+        self.repeat_delay = repeat_delay
+        self.repeat_rate = repeat_rate
+        # key number -> ticks_ms() of its next REPEAT or LONG while held
+        self._next = {}
+        keys.events.clear()
+
+    def poll(self):
+        """Return the (key number, gesture) pairs that happened since the
+        last call, oldest first."""
+        gestures = []
+        now = ticks_ms()
+        events = self._keys.events
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            key = event.key_number
+            if event.pressed:
+                if key in self._repeat_keys:
+                    gestures.append((key, PRESS))
+                    self._next[key] = ticks_add(now, int(self.repeat_delay * 1000))
+                elif key in self._long_keys:
+                    # Can't tell a press from a long press until release
+                    self._next[key] = ticks_add(now, int(self.long_press * 1000))
+                else:
+                    gestures.append((key, PRESS))
+            elif key in self._next:
+                if key in self._long_keys and key not in self._repeat_keys:
+                    gestures.append((key, PRESS))
+                del self._next[key]
+
+        for key in list(self._next):
+            if ticks_diff(now, self._next[key]) < 0:
+                continue
+            if key in self._repeat_keys:
+                gestures.append((key, REPEAT))
+                self._next[key] = ticks_add(now, int(self.repeat_rate * 1000))
+            else:
+                gestures.append((key, LONG))
+                # Long press fires once per hold, and no PRESS on release
+                del self._next[key]
+        return gestures
+
+
+class _FakeEvent:
+    def __init__(self, key_number, pressed):
+        self.key_number = key_number
+        self.pressed = pressed
+        self.released = not pressed
+
+
+class _FakeQueue:
+    def __init__(self):
+        self._events = []
+
+    def get(self):
+        if self._events:
+            return self._events.pop(0)
+        return None
+
+    def clear(self):
+        self._events = []
+
+    def __len__(self):
+        return len(self._events)
+
+
+class FakeKeys:
+    """Stand-in for keypad.Keys on a host without pins: push presses and
+    releases by hand, then hand it to Buttons."""
+
+    def __init__(self, key_count=4):
+        self.key_count = key_count
+        self.events = _FakeQueue()
+
+    def press(self, key_number):
+        self.events._events.append(_FakeEvent(key_number, True))
+
+    def release(self, key_number):
+        self.events._events.append(_FakeEvent(key_number, False))
+
+    def tap(self, key_number):
+        self.press(key_number)
+        self.release(key_number)
@@ -0,0 +1,44 @@
+import asyncio
+
+# Shared wall clock.
+#
+# Clock.now is one struct_time of local time that every screen reads instead
+# of going to the RTC itself. run() refreshes it with a single read on each
+# minute boundary, sleeping in between, and reports the new minute; refresh()
+# takes a read straight away for when the RTC was just set or the zone
+# offset changed.
+
+
+class Clock:
+    def __init__(self, source):
+        """source() returns local time as a struct_time (TimeSync.local)."""
+        self._source = source
+        self._wake = asyncio.Event()
+        self.now = source()
+
+    def tick(self):
+        """Read the time once into now and return it."""
+        self.now = self._source()
+        return self.now
+
+    def refresh(self):
+        """Re-read now and report a changed minute without waiting for the
+        boundary."""
+        self._wake.set()
+
+    async def run(self, on_minute):
+        """Call on_minute(now) whenever the minute on the clock changes."""
+        shown = None
+        while True:
+            self._wake.clear()
+            now = self.tick()
+            minute = (now.tm_year, now.tm_yday, now.tm_hour, now.tm_min)
+            if minute != shown:
+                shown = minute
+                on_minute(now)
+            # The RTC counts whole seconds, so this wakes just past the
+            # boundary, never before it
+            try:
+                await asyncio.wait_for(self._wake.wait(), 60 - now.tm_sec)
+            except asyncio.TimeoutError:
+                pass
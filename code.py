@@ -6,27 +6,31 @@ from adafruit_display_text.label import Label
 from adafruit_display_text.scrolling_label import ScrollingLabel
 from adafruit_display_shapes.rect import Rect
 import board
-from displayio import Group, release_displays, OnDiskBitmap, TileGrid, ColorConverter
+from displayio import Group, release_displays
 from framebufferio import FramebufferDisplay
 from rgbmatrix import RGBMatrix
 from terminalio import FONT
-from time import sleep
-from adafruit_datetime import datetime
-from digitalio import DigitalInOut, Pull
-from rtc import RTC, set_time_source
+from keypad import Keys
 import asyncio
-from adafruit_requests import Session
-from ssl import create_default_context
 from wifi import radio
 from socketpool import SocketPool
-import adafruit_ntp
 from gc import collect
 from storage import remount
-import json
-import string
-import re
-import math
-from api import extract_baseball, extract_basketball, extract_football, extract_ncaab, extract_cfb
+from api import refresh, cached, cache_age, index_of, load_snapshot, close_session, LEAGUES
+from scheduler import PollScheduler, interval_for, SCHEDULED
+from snapshot import flush
+from buttons import Buttons, LONG, REPEAT
+from assets import load as load_assets, tilegrid, sprite, set_sprite
+from scenes import Scene, Stage
+from render import Renderer
+from listview import ListView
+from colors import team_colors
+from status import detail as status_detail, bottom_half, set_utc_offset
+from portal import Portal
+from connection import Connection
+from microcontroller import nvm
+from timesync import TimeSync
+from clock import Clock
 
 #Color palatte
 WHITE = 0xffffff
@@ -40,42 +44,24 @@ MAGENTA = 0xff00ff
 GAME_STAGNANT = 0x8c1919
 GAME_HOVERED = YELLOW
 
-# Initializing Pins
-L_button = DigitalInOut(board.IO5) #PIN0
-R_button = DigitalInOut(board.IO21) #PIN12
-SELECT_button = DigitalInOut(board.IO42) #PIN13
-BACK_button = DigitalInOut(board.IO16) #PIN11
-
-L_button.pull = Pull.UP
-R_button.pull = Pull.UP
-SELECT_button.pull = Pull.UP
-BACK_button.pull = Pull.UP
+# Button pins, in key number order: left, right, select, back
+BUTTON_PINS = (
+    board.IO5,  #PIN0
+    board.IO21, #PIN12
+    board.IO42, #PIN13
+    board.IO16, #PIN11
+)
 
 clock_color = GREEN
 games = []
-ssid = None
-password = None
-
-wifi_small_bmp = OnDiskBitmap(open("bitmaps/wifi_small.bmp", "rb"))
-wifi_small_tilegrid = TileGrid(
-    wifi_small_bmp,
-    pixel_shader=getattr(wifi_small_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=9,
-    tile_height=9,
-    x=0,
-    y=23,
-)
+
+# Open every icon once; screens only ever get shared TileGrids from here on
+load_assets()
+
+wifi_small_tilegrid = tilegrid("wifi_small", "wifi_small", 0, 23)
 wifi_small_tilegrid.hidden = True
 
-api_bmp = OnDiskBitmap(open("bitmaps/api.bmp", "rb"))
-api_tilegrid = TileGrid(
-    api_bmp,
-    pixel_shader=getattr(api_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=13,
-    tile_height=5,
-    x=51,
-    y=27,
-)
+api_tilegrid = tilegrid("api", "api", 51, 27)
 api_tilegrid.hidden = True
 
 # Initializing States
@@ -86,131 +72,149 @@ NBA = 2
 NCAAB = 4
 CFB = 5
 CLOCK = 6
+SETUP = 7
 state = CLOCK
 
-pool = SocketPool(radio)
-ntp = adafruit_ntp.NTP(pool, tz_offset=-5)
-
-def rstrip(s, chars=None):
-    """
-    Return a copy of the string with trailing whitespace removed.
-
-    If chars is given and not None, remove characters in chars instead.
-    """
-    if chars is None:
-        chars = "\t\n\r\f\v\x00"  # Default whitespace characters
-
-    end = len(s)
-    while end > 0 and s[end - 1] in chars:
-        end -= 1
+# api.LEAGUES key for each sport state
+LEAGUE_KEYS = {
+    NFL: "nfl",
+    MLB: "mlb",
+    NBA: "nba",
+    NCAAB: "ncaab",
+    CFB: "cfb",
+}
 
-    return s[:end]
-
-def plus_to_spaces(string):
-    new = ''
-    for c in string:
-        if c == '+':
-            new = new + ' '
+pool = SocketPool(radio)
+# Known networks, kept in NVM; reconnects in the background
+connection = Connection(radio, nvm)
+# Zone for the clock and game start times (a timesync.ZONES key)
+TIME_ZONE = "US/Eastern"
+# Keeps the RTC on UTC from NTP and converts to local time
+time_sync = TimeSync(pool, TIME_ZONE, on_offset=set_utc_offset)
+# Local time snapshot for every screen, refreshed each minute and whenever
+# the RTC is set
+clock = Clock(time_sync.local)
+time_sync.on_sync = clock.refresh
+
+# Events delivered to the active screen, as (kind, value) tuples. For the
+# button kinds value is the buttons gesture (PRESS, LONG or REPEAT).
+LEFT = 0
+RIGHT = 1
+SELECT = 2
+BACK = 3
+DATA = 4    # value is the api.poll() delta for the watched league
+TICK = 5    # next_event() timed out
+MINUTE = 6  # value is clock.now as the minute changed
+OFFLINE = 7 # none of the Wi-Fi networks entered in setup would connect
+
+# Event kind of each key number in BUTTON_PINS
+BUTTONS = (LEFT, RIGHT, SELECT, BACK)
+
+# Seconds a button must be stable before keypad reports it
+DEBOUNCE = 0.02
+# Seconds between drains of the keypad event queue
+INPUT_INTERVAL = 0.02
+# Access point phones join to enter the Wi-Fi credentials
+SETUP_AP = "MinitronAccess"
+SETUP_AP_PASSWORD = "123456789"
+# Seconds before the setup portal is restarted after it failed
+SETUP_RETRY = 5
+# Failed connection rounds with only untested credentials before the menu
+# goes back to setup
+SETUP_AFTER_FAILURES = 3
+# Frames per second of the renderer
+FRAME_RATE = 20
+# Seconds between frame statistics on the serial console
+STATS_INTERVAL = 300
+# Seconds between background league fetches while the menu or clock shows
+PREFETCH_INTERVAL = 20
+
+_events = []
+_event_flag = asyncio.Event()
+
+# League the network task keeps fresh, the game a detail view focuses on,
+# and when to poll next
+watched = None
+watch_focus = None
+poller = PollScheduler()
+
+# Draws one frame per FRAME_RATE tick when something changed
+renderer = Renderer(64, 32, FRAME_RATE)
+# Scene pool and root group, set up by main()
+stage = None
+
+# Row strings and indexes of live games for the games list, and the games
+# list they were built from
+_titles_for = None
+_titles = ()
+_live = ()
+
+# League order of the menu, left to right
+MENU_ORDER = (NFL, MLB, NBA, NCAAB, CFB)
+
+def post(kind, value=None):
+    _events.append((kind, value))
+    _event_flag.set()
+
+async def next_event(timeout=None):
+    """Wait for the next event. With a timeout, returns (TICK, None) if
+    nothing arrived in time."""
+    while not _events:
+        _event_flag.clear()
+        if timeout is None:
+            await _event_flag.wait()
         else:
-            new = new + c
-    return new
-
-# Takes 'Final' or 'Bot 2nd' or 'Day and Time' and strips for time only
-def inning_format(input_string):
-    output_pattern = re.compile(r'\d+:\d+\s*(AM|PM)')
-    output_search = output_pattern.search(input_string)
-    if output_search:
-        return output_search.group(0)  # Access the first captured group
-    else:
-        return input_string
-
-# Takes 'Bot 2nd' or 'Top 2nd' and gives '2nd'
-def inning_number(input_string):
-    # Top of the inning is True, bottom is False
-    output_pattern = re.compile(r'^Top\s*(.*)')
-    output_search = output_pattern.search(input_string)
-    if output_search:
-        return output_search.group(1)
-    
-    output_pattern = re.compile(r'^Bot\s*(.*)')
-    output_search = output_pattern.search(input_string)
-    if output_search:
-        return output_search.group(1)
-    
-    # If neither "Top" nor "Bot" is found, assume it's top by default
-    return input_string
-
-# Takes 'Top #' or 'Bot #' and gives true if Top, false if Bottom (used for arrow icon)
-def top_or_bottom(input_string):
-    output_pattern = re.compile(r'^Bot\s*(.*)')
-    output_search = output_pattern.search(input_string)
-    if output_search:
+            try:
+                await asyncio.wait_for(_event_flag.wait(), timeout)
+            except asyncio.TimeoutError:
+                return (TICK, None)
+    return _events.pop(0)
+
+def request_refresh(layer=None):
+    """Have the next frame show the changes to layer (None: the whole screen)."""
+    renderer.invalidate(layer)
+
+def poll_interval(league, focus_id=None):
+    """Adaptive poll interval for league from the state of its cached games."""
+    return interval_for(cached(league) or (), LEAGUES[league]["final_period"], focus_id)
+
+def watch(league, focus_id=None):
+    """Have the network task keep league fresh, paced by its game state. With
+    focus_id only that game sets the pace. The first poll is due once the
+    cached copy is one interval old, so data from the prefetcher is refreshed
+    right away and fresh data is left alone; a paused league is checked once
+    on entry. None stops polling."""
+    global watched, watch_focus
+    watched = league
+    watch_focus = focus_id
+    if league is None:
+        poller.schedule(None)
+        return
+    interval = poll_interval(league, focus_id) or SCHEDULED
+    age = cache_age(league)
+    poller.schedule(interval, interval if age is None else max(0, interval - age))
+
+def animate(labels):
+    renderer.animate(labels)
+
+def set_text(label, text):
+    """Assign label.text only when it differs, returns True if it changed."""
+    if label.text == text:
         return False
-    else:
-        return True
-    
-def hex_to_rgb(hex_string):
-    """Convert hex string to RGB tuple."""
-    hex_string = hex_string.lstrip('#')
-    return tuple(int(hex_string[i:i+2], 16) for i in (0, 2, 4))
-
-def rgb_to_hex(rgb_tuple):
-    """Convert RGB tuple to hexadecimal integer."""
-    hex_string = '{:02x}{:02x}{:02x}'.format(*rgb_tuple)
-    return int(hex_string, 16)  # Return hexadecimal integer
-
-def brightness(color):
-    """Calculate brightness of a color."""
-    r, g, b = color
-    return (r * 299 + g * 587 + b * 114) / 1000
-
-def color_distance(color1, color2):
-    """Calculate Euclidean distance between two colors in RGB space."""
-    r1, g1, b1 = color1
-    r2, g2, b2 = color2
-    return ((r1 - r2) ** 2 + (g1 - g2) ** 2 + (b1 - b2) ** 2) ** 0.5
-
-def string_to_hex(hex_string):
-    color_int = int(hex_string.lstrip('#'), 16)
-    return hex(color_int)  # Output: 0xffb612
-
-def find_best_color_combo(home_main, home_alt, away_main, away_alt):
-    home_main_rgb = hex_to_rgb(home_main)
-    home_alt_rgb = hex_to_rgb(home_alt)
-    away_main_rgb = hex_to_rgb(away_main)
-    away_alt_rgb = hex_to_rgb(away_alt)
-
-    home_colors = [home_main_rgb, home_alt_rgb]
-    away_colors = [away_main_rgb, away_alt_rgb]
-
-    best_away = None
-    best_home = None
-    best_distance = float('inf')
-    
-    for away_color in away_colors:
-        for home_color in home_colors:
-            # Check if any color is too close to black
-            if brightness(away_color) < 50 or brightness(home_color) < 50:
-                continue
-                
-            # Check if colors are too close to each other
-            if color_distance(away_color, home_color) < 100:
-                continue
-                
-            # Calculate distance between away and home colors
-            distance = color_distance(away_color, home_color)
-            
-            # Update best combo if distance is smaller
-            if distance < best_distance:
-                best_distance = distance
-                best_away = away_color
-                best_home = home_color
-    
-    # If no suitable combination is found, use emergency color (white)
-    if best_away is None or best_home is None:
-        return 0xffffff, 0xffffff  # Return hexadecimal integer
-
-    return rgb_to_hex(best_home), rgb_to_hex(best_away)
+    # Old and new extent, in case the text got shorter
+    request_refresh(label)
+    label.text = text
+    request_refresh(label)
+    return True
+
+def period_sprite(game, final_period):
+    """Name of the period icon for game: q1-q4, ot past final_period, fin."""
+    if game['FINISHED']:
+        return "fin"
+    period = game['QUARTER']
+    if period > final_period:
+        return "ot"
+    return "q%d" % max(period, 1)
     
 def init_Display():
     release_displays()
@@ -223,1280 +227,371 @@ def init_Display():
         latch_pin=board.IO15,
         output_enable_pin=board.IO14,
     )
-    display = FramebufferDisplay(matrix)
+    # The render task decides when to push frames
+    display = FramebufferDisplay(matrix, auto_refresh=False)
 
     return display
 
-def init_RTC():
-    rtcobj = RTC()
-    if radio.connected == False:
-        pass
-    else:
-        rtcobj.datetime = ntp.datetime
-    set_time_source(rtcobj)
-    return rtcobj
-
-def init_WIFI(ssid, password):    
-    print(f'Conn: {ssid}')
-    try:
-        radio.connect(ssid, password)
-        print("Success  ")
-        pool = SocketPool(radio)
-        ntp = adafruit_ntp.NTP(pool, tz_offset=-4)
-    except Exception as e:
-        print(f'Failure: {e}')
-
-    return init_RTC()
-
-FORM_SUBMITTED_FLAG = 1
-
-def find_WIFI():
-    # Set up the ESP32's network interface
-    radio.start_ap("MinitronAccess", password="123456789")  # Set your desired AP name and password
-    pool = SocketPool(radio)  # Initialize socket pool
-
-    # Access Point started. Waiting for a connection
-    print('192.168.4.1')
-
-    # Initialize form_submitted_flag outside the while loop
-    form_submitted_flag = False
+def wifi_connected():
+    """Called by the connection manager after every (re)connect."""
+    # Sockets opened before the drop are dead; start the shared session over
+    close_session()
+    time_sync.request_sync()
+
+def wifi_failed(failures):
+    """Called by the connection manager after every failed round."""
+    # Credentials that never worked are most likely mistyped; a network
+    # that worked before is more likely just down
+    if failures >= SETUP_AFTER_FAILURES and not connection.verified():
+        post(OFFLINE)
+
+def set_color(label, color):
+    """Assign label.color only when it differs, returns True if it changed."""
+    if label.color == color:
+        return False
+    label.color = color
+    request_refresh(label)
+    return True
 
-    # Set up the server socket
-    server_sock = pool.socket()
-    server_sock.bind(("0.0.0.0", 80))
-    server_sock.listen(1)
+def set_tile(grid, name):
+    """set_sprite() that also schedules the frame, returns True if it changed."""
+    if not set_sprite(grid, name):
+        return False
+    request_refresh(grid)
+    return True
+
+def build_Menu():
+    scene = Scene()
+    scene.labels = {}
+    scene.pages = {}
+    first_page = scene.add("first_page", Group())
+    second_page = scene.add("second_page", Group())
+    # One page at a time; bind_Menu() only flips them when the page changes
+    second_page.hidden = True
+    for sport, page, logo_x, text_x in (
+        (NFL, first_page, 3, 3),
+        (MLB, first_page, 24, 24),
+        (NBA, first_page, 45, 45),
+        (NCAAB, second_page, 8, 3),
+        (CFB, second_page, 38, 38),
+    ):
+        league = LEAGUE_KEYS[sport]
+        page.append(tilegrid(league, league, logo_x, 2))
+        text = Label(FONT, color=RED, text=league.upper())
+        text.x = text_x
+        text.y = 24
+        page.append(text)
+        scene.labels[sport] = text
+        scene.pages[sport] = page
+    return scene
+
+def bind_Menu(scene, position):
+    """Highlight the league at position and show the page it is on."""
+    for sport in MENU_ORDER:
+        set_color(scene.labels[sport], MAGENTA if sport == position else RED)
+    on_first = scene.pages[position] is scene.first_page
+    if scene.first_page.hidden == on_first:
+        scene.first_page.hidden = not on_first
+        scene.second_page.hidden = on_first
+        request_refresh()
+
+async def display_Menu():
+    position = NFL
+    scene = stage.show("menu")
+    bind_Menu(scene, position)
+    request_refresh()
 
-    # Main loop
     while True:
-        try:
-            # Accept a connection and get the client socket and address
-            client, addr = server_sock.accept()
-            print("Client connected from", addr)
-
-            # Set the client socket to non-blocking mode
-            client.setblocking(False)
+        kind, value = await next_event()
 
-            # Read the HTTP request data
-            buffer_size = 1024
-            request_data = bytearray(buffer_size)
+        if kind == RIGHT or kind == LEFT:
+            step = 1 if kind == RIGHT else -1
+            position = MENU_ORDER[(MENU_ORDER.index(position) + step) % len(MENU_ORDER)]
+            bind_Menu(scene, position)
 
-            try:
-                num_bytes_received = client.recv_into(request_data, buffer_size)
-                print("Request data:", request_data[:num_bytes_received].decode("utf-8"))
-
-                # Check if the form has been submitted
-                if b"POST /submit" in request_data:
-                    # Extract SSID and Password from the form submission
-                    ssid_start = request_data.find(b"ssid=") + 5
-                    ssid_end = request_data.find(b"&", ssid_start)
-                    ssid = request_data[ssid_start:ssid_end].decode("utf-8")
-
-                    password_start = request_data.find(b"password=") + 9
-                    password_end = request_data.find(b" ", password_start)
-                    password = rstrip(request_data[password_start:password_end].decode("utf-8"))
-
-                    # Set the form submitted flag
-                    form_submitted_flag = True
-
-            except Exception as e:
-                print("Error handling request:", e)
-
-            finally:
-                # Serve the form if it has not been submitted
-                if not form_submitted_flag:
-                    # Send an HTTP response with a form for entering SSID and password
-                    response = (
-                        "HTTP/1.1 200 OK\r\n"
-                        "Content-Type: text/html\r\n\r\n"
-                        "<html><body>"
-                        "<h2>Enter WiFi Credentials</h2>"
-                        '<form action="/submit" method="post">'
-                        'SSID: <input type="text" name="ssid"><br>'
-                        'Password: <input type="password" name="password"><br>'
-                        '<input type="submit" value="Submit">'
-                        '</form>'
-                        "</body></html>"
-                    )
-                    client.send(response)
-
-                # Close the client connection
-                client.close()
-
-                # Restart the access point if the form is submitted
-                if form_submitted_flag:
-                    print("Form submitted. Waiting before restarting Access Point...")
-                    sleep(5)  # Adjust the delay as needed
-                    # print("Restarting Access Point...")
-                    radio.stop_ap()  # Stop the AP before starting it again
-                    print('Stopped access point')
-                    return plus_to_spaces(ssid), password
-        except Exception as e:
-            print("Error:", e)     
-
-def display_Menu(display):
-    # Position Counter
-    position = 0
-
-    # Load BMP image, create Group and TileGrid to hold it
-    nfl_filename = "bitmaps/nfl.bmp"
-    mlb_filename = "bitmaps/mlb.bmp"
-    nba_filename = "bitmaps/nba.bmp"
-    ncaab_filename = "bitmaps/ncaab.bmp"
-    cfb_filename = "bitmaps/cfb.bmp"
-
-    # CircuitPython 6 & 7 compatible
-    nfl_bitmap = OnDiskBitmap(open(nfl_filename, "rb"))
-    nfl_tilegrid = TileGrid(
-        nfl_bitmap,
-        pixel_shader=getattr(nfl_bitmap, 'pixel_shader', ColorConverter()),
-        tile_width=17,
-        tile_height=17,
-        x=3,
-        y=2
-    )
-    
-    mlb_bitmap = OnDiskBitmap(open(mlb_filename, "rb"))
-    mlb_tilegrid = TileGrid(
-        mlb_bitmap,
-        pixel_shader=getattr(mlb_bitmap, 'pixel_shader', ColorConverter()),
-        tile_width=17,
-        tile_height=17,
-        x=24,
-        y=2
-    )
-    
-    nba_bitmap = OnDiskBitmap(open(nba_filename, "rb"))
-    nba_tilegrid = TileGrid(
-        nba_bitmap,
-        pixel_shader=getattr(nba_bitmap, 'pixel_shader', ColorConverter()),
-        tile_width=17,
-        tile_height=17,
-        x=45,
-        y=2
-    )
-
-    ncaab_bitmap = OnDiskBitmap(open(ncaab_filename, "rb"))
-    ncaab_tilegrid = TileGrid(
-        ncaab_bitmap,
-        pixel_shader=getattr(ncaab_bitmap, 'pixel_shader', ColorConverter()),
-        tile_width=17,
-        tile_height=17,
-        x=8,
-        y=2
-    )
-
-    cfb_bitmap = OnDiskBitmap(open(cfb_filename, "rb"))
-    cfb_tilegrid = TileGrid(
-        cfb_bitmap,
-        pixel_shader=getattr(cfb_bitmap, 'pixel_shader', ColorConverter()),
-        tile_width=17,
-        tile_height=17,
-        x=38,
-        y=2
-    )
-    
-    
-    nfl_text = Label(
-    FONT,
-    color=MAGENTA,
-    text="NFL")
-    nfl_text.x = 3
-    nfl_text.y = 24
-    
-    mlb_text = Label(
-    FONT,
-    color=RED,
-    text="MLB")
-    mlb_text.x = 24
-    mlb_text.y = 24
-    
-    nba_text = Label(
-    FONT,
-    color=RED,
-    text="NBA")
-    nba_text.x = 45
-    nba_text.y = 24
-    
-    ncaab_text = Label(
-    FONT,
-    color=MAGENTA,
-    text="NCAAB")
-    ncaab_text.x = 3
-    ncaab_text.y = 24
-
-    cfb_text = Label(
-    FONT,
-    color=RED,
-    text="CFB")
-    cfb_text.x = 38
-    cfb_text.y = 24
-
-    group = Group()
-    group.append(wifi_small_tilegrid)
-    group.append(nfl_tilegrid)
-    group.append(mlb_tilegrid)
-    group.append(nba_tilegrid)
-    group.append(nfl_text)
-    group.append(mlb_text)
-    group.append(nba_text)
-    display.show(group)
-    display.refresh()
-    sleep(0.4) # Debounce
+        elif kind == BACK and value == LONG:
+            return SETUP
 
-    while True:
-        # Internet Interrupt
-        if radio.connected is False:
-            wifi_small_tilegrid.hidden is False
-            try:
-                if int(rtcobj.datetime.tm_sec) == 30:
-                    init_WIFI(ssid, password)
-                    wifi_small_tilegrid.hidden = True
-            except:
-                pass
-        
-        # R Button Press
-        if (R_button.value == False):
-            if position == NFL:
-                nfl_text.color = RED
-                mlb_text.color = MAGENTA
-                nba_text.color = RED
-                position = MLB
-            elif position == MLB:
-                nfl_text.color = RED
-                mlb_text.color = RED
-                nba_text.color = MAGENTA
-                position = NBA
-            elif position == NBA:
-                group.append(ncaab_tilegrid)
-                group.append(ncaab_text)
-                group.append(cfb_tilegrid)
-                group.append(cfb_text)
-                group.remove(nfl_tilegrid)
-                group.remove(mlb_tilegrid)
-                group.remove(nba_tilegrid)
-                group.remove(nfl_text)
-                group.remove(mlb_text)
-                group.remove(nba_text)
-                ncaab_text.color = MAGENTA
-                cfb_text.color = RED
-                display.refresh()
-                position = NCAAB
-            elif position == NCAAB:
-                ncaab_text.color = RED
-                cfb_text.color = MAGENTA
-                position = CFB
-            elif position == CFB:
-                nfl_text.color = MAGENTA
-                mlb_text.color = RED
-                nba_text.color = RED
-                group.remove(ncaab_tilegrid)
-                group.remove(ncaab_text)
-                group.remove(cfb_tilegrid)
-                group.remove(cfb_text)
-                group.append(nfl_tilegrid)
-                group.append(mlb_tilegrid)
-                group.append(nba_tilegrid)
-                group.append(nfl_text)
-                group.append(mlb_text)
-                group.append(nba_text)
-                display.refresh()
-                position = NFL
-            sleep(0.4)
-        
-        # L Button Press
-        elif (L_button.value == False):
-            if position == NFL:
-                group.append(ncaab_tilegrid)
-                group.append(ncaab_text)
-                group.append(cfb_tilegrid)
-                group.append(cfb_text)
-                group.remove(nfl_tilegrid)
-                group.remove(mlb_tilegrid)
-                group.remove(nba_tilegrid)
-                group.remove(nfl_text)
-                group.remove(mlb_text)
-                group.remove(nba_text)
-                cfb_text.color = MAGENTA
-                ncaab_text.color = RED
-                display.refresh()
-                position = CFB
-            elif position == MLB:
-                nfl_text.color = MAGENTA
-                mlb_text.color = RED
-                nba_text.color = RED
-                position = NFL
-            elif position == NBA:
-                nfl_text.color = RED
-                mlb_text.color = MAGENTA
-                nba_text.color = RED
-                position = MLB
-            elif position == NCAAB:
-                nfl_text.color = RED
-                mlb_text.color = RED
-                nba_text.color = MAGENTA
-                group.remove(ncaab_tilegrid)
-                group.remove(ncaab_text)
-                group.remove(cfb_tilegrid)
-                group.remove(cfb_text)
-                group.append(nfl_tilegrid)
-                group.append(mlb_tilegrid)
-                group.append(nba_tilegrid)
-                group.append(nfl_text)
-                group.append(mlb_text)
-                group.append(nba_text)
-                display.refresh()
-                position = NBA
-            elif position == CFB:
-                ncaab_text.color = MAGENTA
-                cfb_text.color = RED
-                position = NCAAB
-            sleep(0.4)
-        
-        elif (BACK_button.value == False):
-            sleep(0.4)
-            group.remove(wifi_small_tilegrid)
+        elif kind == BACK:
             return CLOCK
-           
-        elif (SELECT_button.value == False):
-            sleep(0.4)
-            group.remove(wifi_small_tilegrid)
+
+        elif kind == SELECT:
             return position
-    
 
-def display_GAMES(display, rtcobj):
+        elif kind == OFFLINE:
+            return SETUP
+
+def build_GAMES():
+    scene = Scene()
+    scene.rows = []
+    for i in range(3):
+        row = ScrollingLabel(
+            FONT,
+            color=GAME_STAGNANT,
+            max_characters=10,
+            animate_time=0.5,
+            text=' ')
+        row.x = 2
+        row.y = 5 + 10 * i
+        scene.rows.append(scene.add("row%d" % i, row))
+    scene.add("cursor", Rect(x=0, y=0, width=64, height=10, outline=GAME_HOVERED))
+    scene.list = ListView(scene.rows, set_text)
+    return scene
+
+def game_titles():
+    """'AWAY at HOME' for every game, built once per games list."""
+    global _titles_for, _titles, _live
+    if games is not _titles_for:
+        _titles = [game["AWAY"] + ' at ' + game["HOME"] for game in games]
+        _live = [i for i in range(len(games)) if games[i].get("STATE") == "in"]
+        _titles_for = games
+    return _titles
+
+def next_live(position):
+    """Index of the first game in progress after position, wrapping; position
+    itself when nothing is live."""
+    game_titles()
+    for i in _live:
+        if i > position:
+            return i
+    return _live[0] if _live else position
+
+async def display_GAMES():
     global games
-    game_position = 0
+    # Back from a detail view the list stays where it was
+    returning = bool(games)
     
     if not games:
-        if state == MLB:
-            if radio.connected == True:
-                games = extract_baseball(pool)
-            else:
-                f = open("baseball.json", "r")
-                games = json.load(f)
-                f.close()
-        elif state == NFL:
-            if radio.connected == True:
-                games = extract_football(pool)
-            else:
-                f = open("football.json", "r")
-                games = json.load(f)
-                f.close()
-        elif state == NBA:
-            if radio.connected == True:
-                games = extract_basketball(pool)
-            else:
-                f = open("basketball.json", "r")
-                games = json.load(f)
-                f.close()
-        elif state == NCAAB:
+        # Warm cache from the prefetcher first; the network task refreshes it
+        games = cached(LEAGUE_KEYS[state])
+        if games is None:
             if radio.connected == True:
-                games = extract_ncaab(pool)
+                games, _ = await refresh(pool, LEAGUE_KEYS[state])
             else:
-                f = open("ncaab.json", "r")
-                games = json.load(f)
-                f.close()
-        elif state == CFB:
-            if radio.connected == True:
-                games = extract_cfb(pool)
-            else:
-                f = open("cfb.json", "r")
-                games = json.load(f)
-                f.close()
-    
-    game1_text = ScrollingLabel(
-    FONT,
-    color=GAME_STAGNANT,
-    max_characters=10,
-    animate_time=0.5,
-    text=games[0]["AWAY"] + ' at ' + games[0]["HOME"])
-    game1_text.x = 2
-    game1_text.y = 5
-    
-    game2_text = ScrollingLabel(
-    FONT,
-    color=GAME_STAGNANT,
-    max_characters=10,
-    animate_time=0.5,
-    text=games[1 % len(games)]["AWAY"] + ' at ' + games[1 % len(games)]["HOME"])
-    game2_text.x = 2
-    game2_text.y = 15
-    
-    game3_text = ScrollingLabel(
-    FONT,
-    color=GAME_STAGNANT,
-    max_characters=10,
-    animate_time=0.5,
-    text=games[2 % len(games)]["AWAY"] + ' at ' + games[2 % len(games)]["HOME"])
-    game3_text.x = 2
-    game3_text.y = 25
-        
-    group = Group()
-    group.append(wifi_small_tilegrid)
-    group.append(api_tilegrid)
-    
-    game_labels = []
-    for i in range(min(len(games), 3)):  # Display up to three games
-        game_text = ScrollingLabel(
-            FONT,
-            color=GAME_STAGNANT,
-            max_characters=10,
-            animate_time=0.5,
-            text=games[i]["AWAY"] + ' at ' + games[i]["HOME"]
-        )
-        game_text.x = 2
-        game_text.y = 5 + 10 * i  # Adjust the y-coordinate based on the index
-        game_labels.append(game_text)
-        group.append(game_text)
+                games = load_snapshot(LEAGUE_KEYS[state])
+        if not games:
+            games = []
+            return MENU
 
-    rect = Rect(x=0, y=0, width=64, height=10, outline=GAME_HOVERED)
-    group.append(rect)
+    scene = stage.show("games")
+    rows = scene.list
+    if returning:
+        rows.bind(game_titles(), index_of(games, scene.selected_id, rows.selected))
+    else:
+        rows.bind(game_titles())
+    animate(rows.visible())
+    request_refresh()
+    watch(LEAGUE_KEYS[state])
+    selected_id = games[rows.selected].get("ID")
 
-    display.show(group)
-    display.refresh()
+    while True:
+        kind, value = await next_event()
+
+        # The network task swaps in new games before their DATA event
+        # arrives, so any event may find a different (or empty) slate
+        if not games:
+            # e.g. the scoreboard rolled over to a day without games
+            animate(())
+            watch(None)
+            return MENU
+        if games is not _titles_for:
+            # Keep the cursor on the same game even if ESPN reordered events
+            rows.bind(game_titles(), index_of(games, selected_id, rows.selected))
+            animate(rows.visible())
+
+        if kind == DATA:
+            # Rebound above if anything changed; an unchanged poll costs no
+            # display work
+            continue
+
+        elif kind == RIGHT or kind == LEFT:
+            step = 1 if kind == RIGHT else -1
+            # Holding the button pages through the slate
+            if value == REPEAT:
+                rows.page(step)
+            else:
+                rows.move(step)
+            selected_id = games[rows.selected].get("ID")
 
-    # ... (rest of the function remains unchanged)
+        elif kind == SELECT and value == LONG:
+            rows.select(next_live(rows.selected))
+            selected_id = games[rows.selected].get("ID")
 
-    while True:
-        # Wi-Fi Interrupt
-        if radio.connected == False:
-            wifi_small_tilegrid.hidden = False
-            try:
-                if int(rtcobj.datetime.tm_sec) == 30:
-                    init_WIFI(ssid, password)
-                    wifi_small_tilegrid.hidden = True
-            except:
-                pass
-        else:
-            if int(rtcobj.datetime.tm_sec) == 10:#or int(rtcobj.datetime.tm_sec) == 20 or int(rtcobj.datetime.tm_sec) == 30 or int(rtcobj.datetime.tm_sec) == 40 or int(rtcobj.datetime.tm_sec) == 50
-                api_tilegrid.hidden = False
-                try:
-                    if state == MLB:
-                        games = extract_baseball(pool)
-                    elif state == NBA:
-                        games = extract_basketball(pool)
-                    elif state == NFL:
-                        games = extract_football(pool)
-                    elif state == NCAAB:
-                        games = extract_ncaab(pool)
-                    elif state == CFB:
-                        games = extract_cfb(pool)
-                    api_tilegrid.hidden = True
-                    game1_text.text = games[game_position % len(games)]["AWAY"] + ' at ' + games[game_position % len(games)]["HOME"]
-                    game2_text.text = games[(game_position + 1) % len(games)]["AWAY"] + ' at ' + games[(game_position + 1) % len(games)]["HOME"]
-                    game3_text.text = games[(game_position + 2) % len(games)]["AWAY"] + ' at ' + games[(game_position + 2) % len(games)]["HOME"]
-                    display.refresh()
-                except:
-                    print("FAIL AT GAME")
-       
-        if (R_button.value == False or L_button.value == False):
-            game_position = (game_position + 1) % len(games)
-
-            for i in range(min(3, len(games))):  # Update text for up to three games
-                game_labels[i].text = games[(game_position + i) % len(games)]["AWAY"] + ' at ' + games[(game_position + i) % len(games)]["HOME"]
-
-            display.refresh()
-            sleep(0.2)
-
-        # ... (rest of the loop remains unchanged)
-
-        elif (SELECT_button.value == False):
-            group.remove(wifi_small_tilegrid)
-            group.remove(api_tilegrid)
-            if state == MLB:
-                display_MLB(display, game_position, rtcobj)
-            elif state == NFL:
-                display_NFL(display, game_position, rtcobj)
-            elif state == NBA:
-                display_NBA(display, game_position, rtcobj)
-            elif state == NCAAB:
-                display_NCAAB(display, game_position, rtcobj)
-            elif state == CFB:
-                display_NFL(display, game_position, rtcobj)
-
-            sleep(0.4)
+        elif kind == SELECT:
+            animate(())
+            scene.selected_id = selected_id
+            await display_DETAIL(rows.selected)
             return state
 
-        # ... (rest of the loop remains unchanged)
-
-        elif (BACK_button.value == False):
-            group.remove(wifi_small_tilegrid)
-            group.remove(api_tilegrid)
+        elif kind == BACK:
+            animate(())
+            watch(None)
             games = []
-            sleep(0.4)
+            # Leaving the league: get its latest snapshot onto flash
+            flush(force=True)
             return MENU
 
-def display_MLB(display, game_position, rtcobj):
-    global games
-    
-    home_main = games[game_position]["HOME_COLOR_MAIN"]
-    home_alt = games[game_position]["HOME_COLOR_ALT"]
-    away_main = games[game_position]["AWAY_COLOR_MAIN"]
-    away_alt = games[game_position]["AWAY_COLOR_ALT"]
-    
-    home_color, away_color = find_best_color_combo(home_main, home_alt, away_main, away_alt)
-    
-    away_team_text = Label(
-    FONT,
-    color=away_color,
-    text=games[game_position]["AWAY"])
+def add_matchup(scene):
+    """The 'AWAY at HOME' header every detail scene starts with."""
+    away_team_text = scene.add("away_team_text", Label(FONT, color=WHITE, text='AWY'))
     away_team_text.x = 2
     away_team_text.y = 5
-    
-    at_text = Label(
-    FONT,
-    color=WHITE,
-    text='at')
+    at_text = scene.add("at_text", Label(FONT, color=WHITE, text='at'))
     at_text.x = 27
     at_text.y = 5
-    
-    home_team_text = Label(
-    FONT,
-    color=home_color,
-    text=games[game_position]["HOME"])
+    home_team_text = scene.add("home_team_text", Label(FONT, color=WHITE, text='HOM'))
     home_team_text.x = 45
     home_team_text.y = 5
-    
-    base_bmp = OnDiskBitmap(open("bitmaps/base.bmp", "rb"))
-    base_load_bmp = OnDiskBitmap(open("bitmaps/base_loaded.bmp", "rb"))
-    top_inning_bmp = OnDiskBitmap(open("bitmaps/top_inning.bmp", "rb"))
-    bottom_inning_bmp = OnDiskBitmap(open("bitmaps/bottom_inning.bmp", "rb"))
- 
-    base1_empty_tilegrid = TileGrid(
-        base_bmp,
-        pixel_shader=getattr(base_bmp, 'pixel_shader', ColorConverter()),
-        tile_width=7,
-        tile_height=7,
-        x=53, #Top L
-        y=14 # Top L
-    )
-    
-    base1_filled_tilegrid = TileGrid(
-        base_load_bmp,
-        pixel_shader=getattr(base_load_bmp, 'pixel_shader', ColorConverter()),
-        tile_width=7,
-        tile_height=7,
-        x=53, #Top L
-        y=14 # Top L
-    )        
-    
-    base2_empty_tilegrid = TileGrid(
-        base_bmp,
-        pixel_shader=getattr(base_bmp, 'pixel_shader', ColorConverter()),
-        tile_width=7,
-        tile_height=7,
-        x=48, #Top L
-        y=9 # Top L
-    )
-    
-    base2_filled_tilegrid = TileGrid(
-        base_load_bmp,
-        pixel_shader=getattr(base_load_bmp, 'pixel_shader', ColorConverter()),
-        tile_width=7,
-        tile_height=7,
-        x=48, #Top L
-        y=9 # Top L
-    )
-    
-    base3_empty_tilegrid = TileGrid(
-        base_bmp,
-        pixel_shader=getattr(base_bmp, 'pixel_shader', ColorConverter()),
-        tile_width=7,
-        tile_height=7,
-        x=43, #Top L
-        y=14 # Top L
-    )
 
-    base3_filled_tilegrid = TileGrid(
-        base_load_bmp,
-        pixel_shader=getattr(base_load_bmp, 'pixel_shader', ColorConverter()),
-        tile_width=7,
-        tile_height=7,
-        x=43, #Top L
-        y=14 # Top L
-    )
-    
-    inning_tilegrid = TileGrid(
-    top_inning_bmp,
-    pixel_shader=getattr(top_inning_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=5,
-    tile_height=8,
-    x=26,
-    y=27,
-    )
-    
-    if top_or_bottom(inning_format(games[game_position]['INNING'])) is True:
-        inning_tilegrid.bitmap = top_inning_bmp
-    else:
-        inning_tilegrid.bitmap = bottom_inning_bmp
-    
-    score_text = Label(
-        FONT,
-        color = WHITE,
-        text=games[game_position]['AWAY_SCORE'] + '-' + games[game_position]['HOME_SCORE']
-        )
-    score_text.x = 2
-    score_text.y = 26
-    
-    inning_text = Label(
-        FONT,
-        color = YELLOW,
-        text=inning_format(games[game_position]['INNING'])
-        )
-    inning_text.x = 33
-    inning_text.y = 26
-    
-    bso_text = Label(
-        FONT,
-        color = YELLOW,
-        text=str(games[game_position]['BALLS']) + '/' + str(games[game_position]['STRIKES']) + '/' + str(games[game_position]['OUTS'])
-        )
-    bso_text.x = 4
-    bso_text.y = 15
-    
-    group = Group()
-    group.append(wifi_small_tilegrid)
-    group.append(away_team_text)
-    group.append(at_text)
-    group.append(home_team_text)
-    group.append(score_text)
-    group.append(bso_text)
-    group.append(api_tilegrid)
-    group.append(inning_text)
-    group.append(inning_tilegrid)
-                    
-    if games[game_position]['ON_FIRST'] is True:
-        group.append(base1_filled_tilegrid)
-        last_base1 = True
-    else:
-        group.append(base1_empty_tilegrid)
-        last_base1 = False
-                    
-    if games[game_position]['ON_SECOND'] is True:
-        group.append(base2_filled_tilegrid)
-        last_base2 = True
-        
-    else:
-        group.append(base2_empty_tilegrid)
-        last_base2 = False
-                    
-    if games[game_position]['ON_THIRD'] is True:
-        group.append(base3_filled_tilegrid)
-        last_base3 = True
-    else:
-        group.append(base3_empty_tilegrid)
-        last_base3 = False
-
-    display.show(group)
-    display.refresh()
-
-    while True:
-        # Wi-Fi Interrupt
-        if radio.connected == False:
-            wifi_small_tilegrid.hidden = False
-            try:
-                if int(rtcobj.datetime.tm_sec) == 30:
-                    init_WIFI(ssid, password)
-                    wifi_small_tilegrid.hidden = True
-            except:
-                pass
-        else:
-            # Made this less frequent because of less updates, if not responsive enough, add back 10 and 40 second interrupts
-            if int(rtcobj.datetime.tm_sec) == 20 or int(rtcobj.datetime.tm_sec) == 50:
-                api_tilegrid.hidden = False
-                try:
-                    games = extract_baseball(pool)
-                    api_tilegrid.hidden = True
-
-                    score_text=games[game_position]['AWAY_SCORE'] + '-' + games[game_position]['HOME_SCORE']
-                    inning_text.text=inning_format(games[game_position]['INNING'])
-                    bso_text.text=str(games[game_position]['BALLS']) + '/' + str(games[game_position]['STRIKES']) + '/' + str(games[game_position]['OUTS'])
-
-                    
-                    if games[game_position]['ON_FIRST'] is True:
-                        if last_base1 is False:
-                            group.remove(base1_empty_tilegrid)
-                            group.append(base1_filled_tilegrid)
-                            last_base1 = True
-                    else:
-                        if last_base1 is True:
-                            group.remove(base1_filled_tilegrid)
-                            group.append(base1_empty_tilegrid)
-                            last_base1 = False
-
-                                    
-                    if games[game_position]['ON_SECOND'] is True:
-                        if last_base2 is False:
-                            group.remove(base2_empty_tilegrid)
-                            group.append(base2_filled_tilegrid)
-                            last_base2 = True
-                            
-                    else:
-                        if last_base2 is True:
-                            group.remove(base2_filled_tilegrid)
-                            group.append(base2_empty_tilegrid)
-                            last_base2 = False
-
-                                    
-                    if games[game_position]['ON_THIRD'] is True:
-                        if last_base3 is False:
-                            group.remove(base3_empty_tilegrid)
-                            group.append(base3_filled_tilegrid)
-                            last_base3 = True
-
-                    else:
-                        if last_base3 is True:
-                            group.remove(base3_filled_tilegrid)
-                            group.append(base3_empty_tilegrid)
-                            last_base3 = False
-                    
-                    if top_or_bottom(inning_format(games[game_position]['INNING'])) is True:
-                        inning_tilegrid.bitmap = top_inning_bmp
-                    else:
-                        inning_tilegrid.bitmap = bottom_inning_bmp
-                    
-                    display.refresh()
-                except:
-                    api_tilegrid.hidden = True
-                    print("FAIL")
-
-        if (BACK_button.value == False):
-            group.remove(wifi_small_tilegrid)
-            group.remove(api_tilegrid)
-            return
-        
-def display_NBA(display, game_position, rtcobj):
-    global games
-    
-    if len(games[game_position]["AWAY"]) == 3:
-        away_x = 2
-        away_y = 5
-    else:
-        away_x = 0
-        away_y = 5
-    
-    if len(games[game_position]["HOME"]) == 3:
-        home_x = 45
-        home_y = 5
-    else:
-        home_x = 40
-        home_y = 5
-    
-    home_main = games[game_position]["HOME_COLOR_MAIN"]
-    home_alt = games[game_position]["HOME_COLOR_ALT"]
-    away_main = games[game_position]["AWAY_COLOR_MAIN"]
-    away_alt = games[game_position]["AWAY_COLOR_ALT"]
-    
-    home_color, away_color = find_best_color_combo(home_main, home_alt, away_main, away_alt)
-    
-    away_team_text = Label(
-    FONT,
-    color=away_color,
-    text=games[game_position]["AWAY"])
-    away_team_text.x = away_x
-    away_team_text.y = away_y
-    
-    
-    at_text = Label(
-    FONT,
-    color=WHITE,
-    text='at')
-    at_text.x = 27
-    at_text.y = 5
-    
-    
-    home_team_text = Label(
-    FONT,
-    color=home_color,
-    text=games[game_position]["HOME"])
-    home_team_text.x = home_x
-    home_team_text.y = home_y
-    
-    
-    away_text = Label(
+def add_scores(scene, y):
+    scene.add("away_text", Label(
         FONT,
         color = WHITE,
-        text=games[game_position]['AWAY_SCORE'],
+        text='0',
         anchor_point=(0.5,0),
-        anchored_position=(12, 10))
-    
-    home_text = Label(
+        anchored_position=(12, y)))
+    scene.add("home_text", Label(
         FONT,
         color = WHITE,
-        text=games[game_position]['HOME_SCORE'],
+        text='0',
         anchor_point=(0.5,0),
-        anchored_position=(53, 10))
-    
-    q1_bmp = OnDiskBitmap(open("bitmaps/q1.bmp", "rb"))
-    q2_bmp = OnDiskBitmap(open("bitmaps/q2.bmp", "rb"))
-    q3_bmp = OnDiskBitmap(open("bitmaps/q3.bmp", "rb"))
-    q4_bmp = OnDiskBitmap(open("bitmaps/q4.bmp", "rb"))
-    ot_bmp = OnDiskBitmap(open("bitmaps/ot.bmp", "rb"))
-    fin_bmp = OnDiskBitmap(open("bitmaps/fin.bmp", "rb"))
-    
-    q_tilegrid = TileGrid(
-    q1_bmp,
-    pixel_shader=getattr(q1_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=15,
-    tile_height=8,
-    x=24,
-    y=24,
-    )
-    
-    if games[game_position]['FINISHED'] is False:
-        if games[game_position]['QUARTER'] == 1:
-            q_tilegrid.bitmap = q1_bmp
-        elif games[game_position]['QUARTER'] == 2:
-            q_tilegrid.bitmap = q2_bmp
-        elif games[game_position]['QUARTER'] == 3:
-            q_tilegrid.bitmap = q3_bmp
-        elif games[game_position]['QUARTER'] == 4:
-            q_tilegrid.bitmap = q4_bmp
-        elif games[game_position]['QUARTER'] > 4:
-            q_tilegrid.bitmap = ot_bmp
-    else:
-        q_tilegrid.bitmap = fin_bmp
-    
-    basketball_bmp = OnDiskBitmap(open("bitmaps/basketball.bmp", "rb"))
-    basketball_tilegrid = TileGrid(
-    basketball_bmp,
-    pixel_shader=getattr(basketball_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=11,
-    tile_height=11,
-    x=26,
-    y=12,
-    )
-    
-    group = Group()
-    group.append(wifi_small_tilegrid)
-    group.append(api_tilegrid)
-    group.append(away_team_text)
-    group.append(at_text)
-    group.append(home_team_text)
-    group.append(q_tilegrid)
-    group.append(away_text)
-    group.append(home_text)
-    group.append(basketball_tilegrid)
-    display.show(group)
-    display.refresh()
+        anchored_position=(53, y)))
 
-    while True:
-        if radio.connected == False:
-            wifi_small_tilegrid.hidden = False
-            try:
-                if int(rtcobj.datetime.tm_sec) == 30:
-                    init_WIFI(ssid, password)
-                    wifi_small_tilegrid.hidden = True
-            except:
-                pass
-        else:
-            if int(rtcobj.datetime.tm_sec) == 10 or int(rtcobj.datetime.tm_sec) == 20 or int(rtcobj.datetime.tm_sec) == 40 or int(rtcobj.datetime.tm_sec) == 50:
-                api_tilegrid.hidden = False
-                try:
-                    games = extract_basketball(pool)
-                    api_tilegrid.hidden = True
-                    away_team_text.text=games[game_position]["AWAY"]
-                    at_text.text='at'
-                    home_team_text.text=games[game_position]["HOME"]
-                    away_text.text=games[game_position]['AWAY_SCORE']
-                    home_text.text=games[game_position]['HOME_SCORE']
-                    
-                    
-                    if games[game_position]['FINISHED'] is False:
-                        if games[game_position]['QUARTER'] == 1:
-                            q_tilegrid.bitmap = q1_bmp
-                        elif games[game_position]['QUARTER'] == 2:
-                            q_tilegrid.bitmap = q2_bmp
-                        elif games[game_position]['QUARTER'] == 3:
-                            q_tilegrid.bitmap = q3_bmp
-                        elif games[game_position]['QUARTER'] == 4:
-                            q_tilegrid.bitmap = q4_bmp
-                    else:
-                        q_tilegrid.bitmap = fin_bmp
-                    
-                    
-                    display.refresh()
-                except:
-                    print("FAIL")
-                    
-                api_tilegrid.hidden = True
-
-        if (BACK_button.value == False):
-            group.remove(wifi_small_tilegrid)
-            group.remove(api_tilegrid)
-            return
-        
-def display_NCAAB(display, game_position, rtcobj):
-    global games
-    
-    if len(games[game_position]["AWAY"]) == 3:
-        away_x = 2
-        away_y = 5
-    else:
-        away_x = 0
-        away_y = 5
-    
-    if len(games[game_position]["HOME"]) == 3:
-        home_x = 45
-        home_y = 5
-    else:
-        home_x = 40
-        home_y = 5
-    
-    home_main = games[game_position]["HOME_COLOR_MAIN"]
-    home_alt = games[game_position]["HOME_COLOR_ALT"]
-    away_main = games[game_position]["AWAY_COLOR_MAIN"]
-    away_alt = games[game_position]["AWAY_COLOR_ALT"]
-    
-    home_color, away_color = find_best_color_combo(home_main, home_alt, away_main, away_alt)
-    
-    away_team_text = Label(
-    FONT,
-    color=away_color,
-    text=games[game_position]["AWAY"])
-    away_team_text.x = away_x
-    away_team_text.y = away_y
-    
-    
-    at_text = Label(
-    FONT,
-    color=WHITE,
-    text='at')
-    at_text.x = 27
-    at_text.y = 5
-    
-    
-    home_team_text = Label(
-    FONT,
-    color=home_color,
-    text=games[game_position]["HOME"])
-    home_team_text.x = home_x
-    home_team_text.y = home_y
-    
-    
-    away_text = Label(
-        FONT,
-        color = WHITE,
-        text=games[game_position]['AWAY_SCORE'],
-        anchor_point=(0.5,0),
-        anchored_position=(12, 10))
-    
-    home_text = Label(
-        FONT,
-        color = WHITE,
-        text=games[game_position]['HOME_SCORE'],
-        anchor_point=(0.5,0),
-        anchored_position=(53, 10))
-    
-    q1_bmp = OnDiskBitmap(open("bitmaps/q1.bmp", "rb"))
-    q2_bmp = OnDiskBitmap(open("bitmaps/q2.bmp", "rb"))
-    ot_bmp = OnDiskBitmap(open("bitmaps/ot.bmp", "rb"))
-    fin_bmp = OnDiskBitmap(open("bitmaps/fin.bmp", "rb"))
-    
-    q_tilegrid = TileGrid(
-    q1_bmp,
-    pixel_shader=getattr(q1_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=15,
-    tile_height=8,
-    x=24,
-    y=24,
-    )
-    
-    if games[game_position]['FINISHED'] is False:
-        if games[game_position]['QUARTER'] == 1:
-            q_tilegrid.bitmap = q1_bmp
-        elif games[game_position]['QUARTER'] == 2:
-            q_tilegrid.bitmap = q2_bmp
-        elif games[game_position]['QUARTER'] >= 3:
-            q_tilegrid.bitmap = ot_bmp
-    else:
-        q_tilegrid.bitmap = fin_bmp
-    
-    basketball_bmp = OnDiskBitmap(open("bitmaps/basketball.bmp", "rb"))
-    basketball_tilegrid = TileGrid(
-    basketball_bmp,
-    pixel_shader=getattr(basketball_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=11,
-    tile_height=11,
-    x=26,
-    y=12,
-    )
-    
-    group = Group()
-    group.append(wifi_small_tilegrid)
-    group.append(api_tilegrid)
-    group.append(away_team_text)
-    group.append(at_text)
-    group.append(home_team_text)
-    group.append(q_tilegrid)
-    group.append(away_text)
-    group.append(home_text)
-    group.append(basketball_tilegrid)
-    display.show(group)
-    display.refresh()
+def build_MLB():
+    scene = Scene()
+    add_matchup(scene)
+    score_text = scene.add("score_text", Label(FONT, color=WHITE, text='0-0'))
+    score_text.x = 2
+    score_text.y = 26
+    bso_text = scene.add("bso_text", Label(FONT, color=YELLOW, text='0/0/0'))
+    bso_text.x = 4
+    bso_text.y = 15
+    inning_text = scene.add("inning_text", Label(FONT, color=YELLOW, text=' '))
+    inning_text.x = 33
+    inning_text.y = 26
+    scene.add("inning_tilegrid", sprite("inning", "top_inning", 26, 27))
+    scene.add("base1_tilegrid", sprite("base1", "base", 53, 14))
+    scene.add("base2_tilegrid", sprite("base2", "base", 48, 9))
+    scene.add("base3_tilegrid", sprite("base3", "base", 43, 14))
+    return scene
+
+def build_BASKETBALL():
+    scene = Scene()
+    add_matchup(scene)
+    add_scores(scene, 10)
+    scene.add("q_tilegrid", sprite("basketball_period", "q1", 24, 24))
+    scene.add("basketball_tilegrid", tilegrid("basketball", "basketball", 26, 12))
+    return scene
+
+def build_FOOTBALL():
+    scene = Scene()
+    add_matchup(scene)
+    add_scores(scene, 15)
+    scene.add("fball_tilegrid", tilegrid("fball", "fball", 26, 16))
+    scene.add("q_tilegrid", sprite("football_period", "q1", 24, 24))
+    return scene
+
+def bind_teams(scene, game, league, fit=False):
+    """Team names and the most readable color pair. With fit, names that
+    aren't three letters move out to the panel edges."""
+    home_color, away_color = team_colors(league, game)
+    away, home = game["AWAY"], game["HOME"]
+    set_text(scene.away_team_text, away)
+    set_text(scene.home_team_text, home)
+    set_color(scene.away_team_text, away_color)
+    set_color(scene.home_team_text, home_color)
+    scene.away_team_text.x = 2 if not fit or len(away) == 3 else 0
+    scene.home_team_text.x = 45 if not fit or len(home) == 3 else 40
+
+def bind_MLB(scene, game, league):
+    changed = set_text(scene.score_text, game['AWAY_SCORE'] + '-' + game['HOME_SCORE'])
+    changed |= set_text(scene.inning_text, status_detail(game))
+    changed |= set_text(scene.bso_text, str(game['BALLS']) + '/' + str(game['STRIKES']) + '/' + str(game['OUTS']))
+    changed |= set_tile(scene.base1_tilegrid, "base_loaded" if game['ON_FIRST'] else "base")
+    changed |= set_tile(scene.base2_tilegrid, "base_loaded" if game['ON_SECOND'] else "base")
+    changed |= set_tile(scene.base3_tilegrid, "base_loaded" if game['ON_THIRD'] else "base")
+    changed |= set_tile(scene.inning_tilegrid, "bottom_inning" if bottom_half(game) else "top_inning")
+    return changed
+
+def bind_SCORES(scene, game, league):
+    changed = set_text(scene.away_text, game['AWAY_SCORE'])
+    changed |= set_text(scene.home_text, game['HOME_SCORE'])
+    changed |= set_tile(scene.q_tilegrid, period_sprite(game, LEAGUES[league]["final_period"]))
+    return changed
+
+# league: (scene, binder for the live fields, fit team names)
+DETAIL = {
+    "mlb": ("mlb", bind_MLB, False),
+    "nba": ("basketball", bind_SCORES, True),
+    "ncaab": ("basketball", bind_SCORES, True),
+    "nfl": ("football", bind_SCORES, False),
+    "cfb": ("football", bind_SCORES, False),
+}
+
+async def display_DETAIL(game_position):
+    """Live view of one game of the current league until BACK."""
+    league = LEAGUE_KEYS[state]
+    name, bind, fit = DETAIL[league]
+    game_id = games[game_position].get("ID")
+
+    scene = stage.show(name)
+    bind_teams(scene, games[game_position], league, fit)
+    bind(scene, games[game_position], league)
+    request_refresh()
+    watch(league, game_id)
 
     while True:
-        if radio.connected == False:
-            wifi_small_tilegrid.hidden = False
-            try:
-                if int(rtcobj.datetime.tm_sec) == 30:
-                    init_WIFI(ssid, password)
-                    wifi_small_tilegrid.hidden = True
-            except:
-                pass
-        else:
-            if int(rtcobj.datetime.tm_sec) == 10 or int(rtcobj.datetime.tm_sec) == 20 or int(rtcobj.datetime.tm_sec) == 40 or int(rtcobj.datetime.tm_sec) == 50:
-                api_tilegrid.hidden = False
-                try:
-                    games = extract_NCAAB(pool)
-                    api_tilegrid.hidden = True
-                    away_team_text.text=games[game_position]["AWAY"]
-                    at_text.text='at'
-                    home_team_text.text=games[game_position]["HOME"]
-                    away_text.text=games[game_position]['AWAY_SCORE']
-                    home_text.text=games[game_position]['HOME_SCORE']
-                    
-                    
-                    if games[game_position]['FINISHED'] is False:
-                        if games[game_position]['QUARTER'] == 1:
-                            q_tilegrid.bitmap = q1_bmp
-                        elif games[game_position]['QUARTER'] == 2:
-                            q_tilegrid.bitmap = q2_bmp
-                        elif games[game_position]['QUARTER'] == 3:
-                            q_tilegrid.bitmap = q3_bmp
-                        elif games[game_position]['QUARTER'] == 4:
-                            q_tilegrid.bitmap = q4_bmp
-                    else:
-                        q_tilegrid.bitmap = fin_bmp
-                    
-                    
-                    display.refresh()
-                except:
-                    print("FAIL")
-                    
-                api_tilegrid.hidden = True
-
-        if (BACK_button.value == False):
-            group.remove(wifi_small_tilegrid)
-            group.remove(api_tilegrid)
-            return
+        kind, value = await next_event()
 
-def display_NFL(display, game_position, rtcobj):
-    global games
-    home_main = games[game_position]["HOME_COLOR_MAIN"]
-    home_alt = games[game_position]["HOME_COLOR_ALT"]
-    away_main = games[game_position]["AWAY_COLOR_MAIN"]
-    away_alt = games[game_position]["AWAY_COLOR_ALT"]
-    
-    home_color, away_color = find_best_color_combo(home_main, home_alt, away_main, away_alt)
-    
-    away_team_text = Label(
-    FONT,
-    color=away_color,
-    text=games[game_position]["AWAY"])
-    away_team_text.x = 2
-    away_team_text.y = 5
-    
-    
-    at_text = Label(
-    FONT,
-    color=WHITE,
-    text='at')
-    at_text.x = 27
-    at_text.y = 5
-    
-    
-    home_team_text = Label(
-    FONT,
-    color=home_color,
-    text=games[game_position]["HOME"])
-    home_team_text.x = 45
-    home_team_text.y = 5
-    
-    away_text = Label(
-        FONT,
-        color = WHITE,
-        text=games[game_position]['AWAY_SCORE'],
-        anchor_point=(0.5,0),
-        anchored_position=(12, 15))
-    
-    home_text = Label(
-        FONT,
-        color = WHITE,
-        text=games[game_position]['HOME_SCORE'],
-        anchor_point=(0.5,0),
-        anchored_position=(53, 15))
-    
-    q1_bmp = OnDiskBitmap(open("bitmaps/q1.bmp", "rb"))
-    q2_bmp = OnDiskBitmap(open("bitmaps/q2.bmp", "rb"))
-    q3_bmp = OnDiskBitmap(open("bitmaps/q3.bmp", "rb"))
-    q4_bmp = OnDiskBitmap(open("bitmaps/q4.bmp", "rb"))
-    ot_bmp = OnDiskBitmap(open("bitmaps/ot.bmp", "rb"))
-    fin_bmp = OnDiskBitmap(open("bitmaps/fin.bmp", "rb"))
-    
-    q_tilegrid = TileGrid(
-    q1_bmp,
-    pixel_shader=getattr(q1_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=15,
-    tile_height=8,
-    x=24,
-    y=24,
-    )
-    
-    if games[game_position]['FINISHED'] is False:
-        if games[game_position]['QUARTER'] == 1:
-            q_tilegrid.bitmap = q1_bmp
-        elif games[game_position]['QUARTER'] == 2:
-            q_tilegrid.bitmap = q2_bmp
-        elif games[game_position]['QUARTER'] == 3:
-            q_tilegrid.bitmap = q3_bmp
-        elif games[game_position]['QUARTER'] == 4:
-            q_tilegrid.bitmap = q4_bmp
-        elif games[game_position]['QUARTER'] > 4:
-            q_tilegrid.bitmap= ot_bmp
-    else:
-        q_tilegrid.bitmap = fin_bmp
-        
-    fball_bmp = OnDiskBitmap(open("bitmaps/fball.bmp", "rb"))
-    fball_tilegrid = TileGrid(
-    fball_bmp,
-    pixel_shader=getattr(fball_bmp, 'pixel_shader', ColorConverter()),
-    tile_width=11,
-    tile_height=7,
-    x=26,
-    y=16,
-    )
-    
-    
-    group = Group()
-    group.append(wifi_small_tilegrid)
-    group.append(api_tilegrid)
-    group.append(away_team_text)
-    group.append(home_team_text)
-    group.append(at_text)
-    group.append(away_text)
-    group.append(home_text)
-    group.append(fball_tilegrid)
-    group.append(q_tilegrid)
-    display.show(group)
-    display.refresh()
+        if kind == DATA:
+            game_position = index_of(games, game_id, game_position)
 
-    while True:
-        if radio.connected == False:
-            wifi_small_tilegrid.hidden = False
-            try:
-                if int(rtcobj.datetime.tm_sec) == 30:
-                    init_WIFI(ssid, password)
-                    wifi_small_tilegrid.hidden = True
-            except:
-                pass
-        else:
-            if int(rtcobj.datetime.tm_sec) == 10 or int(rtcobj.datetime.tm_sec) == 20 or int(rtcobj.datetime.tm_sec) == 40 or int(rtcobj.datetime.tm_sec) == 50:
-                api_tilegrid.hidden = False
-                try:
-                    games = extract_football(pool)
-                    api_tilegrid.hidden = True
-                    away_team_text.text=games[game_position]["AWAY"]
-                    at_text.text='at'
-                    home_team_text.text=games[game_position]["HOME"]
-                    away_text.text=games[game_position]['AWAY_SCORE']
-                    home_text.text=games[game_position]['HOME_SCORE']
-                    9
-                    if games[game_position]['FINISHED'] is False:
-                        if games[game_position]['QUARTER'] == 1:
-                            q_tilegrid.bitmap = q1_bmp
-                        elif games[game_position]['QUARTER'] == 2:
-                            q_tilegrid.bitmap = q2_bmp
-                        elif games[game_position]['QUARTER'] == 3:
-                            q_tilegrid.bitmap = q3_bmp
-                        elif games[game_position]['QUARTER'] == 4:
-                            q_tilegrid.bitmap = q4_bmp
-                    else:
-                        q_tilegrid.bitmap = fin_bmp
-                    
-                    display.refresh()
-                except:
-                    print("FAIL")
-                
-                api_tilegrid.hidden = True
-        
-        # Wi-Fi Interrupt
-        if radio.connected == False:
-            wifi_small_tilegrid.hidden = False
-            try:
-                init_WIFI(ssid, password)
-                wifi_small_tilegrid.hidden = True
-            except:
-                pass
+            # Nothing on screen changed since the last poll
+            if game_id not in value["changed"] and game_id not in value["added"]:
+                continue
 
+            bind(scene, games[game_position], league)
 
-        if (BACK_button.value == False):
-            group.remove(wifi_small_tilegrid)
-            group.remove(api_tilegrid)
+        elif kind == BACK:
             return
 
-async def update_CLOCK(rtcobj, time_text):
-    await asyncio.sleep(1)
-    hour = None
-    ampm = None
-    if int(rtcobj.datetime.tm_hour) > 12:
-        hour = int(rtcobj.datetime.tm_hour) - 12
-        ampm = 'PM' 
-    else:
-        hour = int(rtcobj.datetime.tm_hour)
-        ampm = 'AM'
-    time_text.text = f'{hour:02}' + ':' + f'{int(rtcobj.datetime.tm_min):02}'
-    
-    if radio.connected == False:
-        wifi_small_tilegrid.hidden = False
-    
-    if int(rtcobj.datetime.tm_sec) == 10 or int(rtcobj.datetime.tm_sec) == 20 or int(rtcobj.datetime.tm_sec) == 30 or int(rtcobj.datetime.tm_sec) == 40 or int(rtcobj.datetime.tm_sec) == 50:
-        await wifi_reconnect()
-    
 
-async def display_CLOCK(display, rtcobj):
-    global clock_color
-    print('Outside', clock_color)
-    hour = None
-    ampm = None
-    if int(rtcobj.datetime.tm_hour) > 12:
-        hour = int(rtcobj.datetime.tm_hour) - 12
-        ampm = 'PM'
-    elif int(rtcobj.datetime.tm_hour) == 12:
-        ampm = 'PM'
-    else:
-        hour = int(rtcobj.datetime.tm_hour)
-        ampm = 'AM'
-    #response = update_CLOCK(requests)
-    time_text = Label(
-    FONT,
-    color=clock_color,
-    text=f'{hour:02}' + ':' + f'{int(rtcobj.datetime.tm_min):02}',
-    scale=2)
+def clock_strings(now):
+    """('hh:mm', 'AM'/'PM') for a struct_time, 12-hour style."""
+    hour = int(now.tm_hour)
+    ampm = 'PM' if hour >= 12 else 'AM'
+    hour = hour % 12 or 12
+    return f'{hour:02}' + ':' + f'{int(now.tm_min):02}', ampm
+
+def build_CLOCK():
+    scene = Scene()
+    time_text = scene.add("time_text", Label(FONT, color=clock_color, text='12:00', scale=2))
     time_text.x = 3
     time_text.y = 11
-    
-    am_pm_text = Label(
-    FONT,
-    color=clock_color,
-    text=ampm,
-    scale=1)
+    am_pm_text = scene.add("am_pm_text", Label(FONT, color=clock_color, text='AM', scale=1))
     am_pm_text.x = 27
     am_pm_text.y = 26
-    
-    group = Group()
-    group.append(time_text)
-    group.append(am_pm_text)
-    group.append(wifi_small_tilegrid)
-    display.show(group)
-    display.refresh()
+    return scene
+
+async def display_CLOCK():
+    global clock_color
+    scene = stage.show("clock")
+    set_color(scene.time_text, clock_color)
+    set_color(scene.am_pm_text, clock_color)
+    hhmm, ampm = clock_strings(clock.now)
+    set_text(scene.time_text, hhmm)
+    set_text(scene.am_pm_text, ampm)
+    request_refresh()
     
     while True:
-        clock_task = asyncio.create_task(update_CLOCK(rtcobj, time_text))
-        await asyncio.gather(clock_task)
-        
-        #if L_button.value == False or R_button.value == False:        
-        if BACK_button.value == False or SELECT_button.value == False:
+        kind, value = await next_event()
+
+        if kind == MINUTE:
+            hhmm, ampm = clock_strings(value)
+            set_text(scene.time_text, hhmm)
+            set_text(scene.am_pm_text, ampm)
+
+        elif kind == BACK or kind == SELECT:
             if clock_color == GREEN:
                 clock_color = WHITE
             elif clock_color == WHITE:
@@ -1511,42 +606,184 @@ async def display_CLOCK(display, rtcobj):
                 clock_color = GREEN
             else:
                 clock_color = GREEN
-            group.remove(wifi_small_tilegrid)
             return MENU
 
-
-async def wifi_reconnect():
-    if radio.connected == False:
-        print("Wi-Fi Disconnected, reconnecting...")
+def build_SETUP():
+    scene = Scene()
+    title = scene.add("title", Label(FONT, color=CYAN, text='WiFi setup'))
+    title.x = 2
+    title.y = 5
+    hint = scene.add("hint", ScrollingLabel(
+        FONT,
+        color=WHITE,
+        max_characters=10,
+        animate_time=0.3,
+        text='Join ' + SETUP_AP + ', open 192.168.4.1 '))
+    hint.x = 2
+    hint.y = 18
+    return scene
+
+async def display_SETUP():
+    """Collect Wi-Fi credentials over the access point, then connect.
+
+    The portal runs as its own task, so the hint keeps scrolling and the
+    other tasks keep going while phones fill in the form. BACK leaves
+    without changes when there are networks to fall back on.
+    """
+    scene = stage.show("setup")
+    animate((scene.hint,))
+    request_refresh()
+    # Keep the connection manager off the radio while the access point is up
+    connection.paused = True
+
+    credentials = None
+    leave = False
+    while credentials is None and not leave:
+        set_text(scene.title, 'WiFi setup')
         try:
-            init_WIFI(ssid, password)
-            wifi_small_tilegrid.hidden = True
-        except:
-            pass
+            radio.start_ap(SETUP_AP, password=SETUP_AP_PASSWORD)
+            print('Setup portal on', radio.ipv4_address_ap)
+            server = asyncio.create_task(Portal(pool).serve())
+            while not server.done():
+                kind, value = await next_event(1)
+                if kind == BACK and connection.networks:
+                    server.cancel()
+                    leave = True
+                    break
+            if not leave:
+                credentials = await server
+        except Exception as e:
+            print('Setup portal failed:', e)
+        radio.stop_ap()
+        if credentials is None and not leave:
+            # Say so on the panel and start over
+            set_text(scene.title, 'Setup error')
+            await asyncio.sleep(SETUP_RETRY)
+    animate(())
+    connection.paused = False
+    if credentials is not None:
+        # The connection manager picks it up from here
+        connection.remember(*credentials)
+    return MENU
+
+async def input_task(buttons):
+    """Post every button gesture as (kind, gesture) for the active screen.
+
+    keypad queues edges in the background, so presses made while the loop
+    was blocked are delivered late rather than lost.
+    """
+    while True:
+        for key, gesture in buttons.poll():
+            post(BUTTONS[key], gesture)
+        await asyncio.sleep(INPUT_INTERVAL)
+
+async def wifi_task():
+    """Show the Wi-Fi icon while disconnected; the connection manager does
+    the reconnecting."""
+    while True:
+        if wifi_small_tilegrid.hidden == radio.connected:
+            wifi_small_tilegrid.hidden = radio.connected
+            request_refresh(wifi_small_tilegrid)
+        await asyncio.sleep(1)
+
+async def network_task():
+    """Poll the watched league when the scheduler says so and hand the delta
+    to the screen as a DATA event."""
+    global games
+    while True:
+        league = watched
+        if league is not None and radio.connected and poller.due():
+            api_tilegrid.hidden = False
+            request_refresh(api_tilegrid)
+            # Let the renderer draw the API icon before the fetch blocks
+            await asyncio.sleep(1 / FRAME_RATE)
+            new_games, delta = await refresh(pool, league)
+            api_tilegrid.hidden = True
+            request_refresh(api_tilegrid)
+            # The screen may have moved on while we were fetching
+            if league == watched:
+                if new_games is None:
+                    poller.failed()
+                else:
+                    games = new_games
+                    poller.succeeded(poll_interval(league, watch_focus))
+                    post(DATA, delta)
+        await asyncio.sleep(0.5)
+
+async def prefetch_task():
+    """Keep every league warm in api's cache, one league per
+    PREFETCH_INTERVAL, while nothing is being watched (menu or clock)."""
+    leagues = [LEAGUE_KEYS[sport] for sport in (NFL, MLB, NBA, NCAAB, CFB)]
+    turn = 0
+    while True:
+        await asyncio.sleep(PREFETCH_INTERVAL)
+        if watched is not None or not radio.connected:
+            continue
+        if state != MENU and state != CLOCK:
+            continue
+        league = leagues[turn % len(leagues)]
+        turn += 1
+        # Skip leagues something else fetched during the last round
+        await refresh(pool, league, PREFETCH_INTERVAL * len(leagues))
+
+async def stats_task():
+    """Log the renderer's frame statistics every STATS_INTERVAL."""
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+        print("Render:", renderer.stats())
+        renderer.reset_stats()
+
+async def main(display):
+    global state, stage
+    stage = Stage(display, (wifi_small_tilegrid, api_tilegrid))
+    stage.register("menu", build_Menu)
+    stage.register("games", build_GAMES)
+    stage.register("mlb", build_MLB)
+    stage.register("basketball", build_BASKETBALL)
+    stage.register("football", build_FOOTBALL)
+    stage.register("clock", build_CLOCK)
+    stage.register("setup", build_SETUP)
+
+    keys = Keys(BUTTON_PINS, value_when_pressed=False, pull=True, interval=DEBOUNCE)
+    # Holding left/right keeps scrolling, holding select jumps to a live game
+    # and holding back in the menu opens Wi-Fi setup
+    buttons = Buttons(keys, repeat_keys=(0, 1), long_keys=(2, 3))
+    asyncio.create_task(input_task(buttons))
+    asyncio.create_task(wifi_task())
+    asyncio.create_task(connection.run(wifi_connected, wifi_failed))
+    asyncio.create_task(time_sync.run())
+    asyncio.create_task(clock.run(lambda now: post(MINUTE, now)))
+    asyncio.create_task(network_task())
+    asyncio.create_task(prefetch_task())
+    asyncio.create_task(renderer.run(display))
+    asyncio.create_task(stats_task())
+
+    # Screens are awaited one at a time; each returns the next state
+    state = MENU if connection.networks else SETUP
+    while True:
+        if state == MENU:
+            state = await display_Menu()
+        elif state == NFL or state == NBA or state == MLB or state == NCAAB or state == CFB:
+            state = await display_GAMES()
+        elif state == CLOCK:
+            # The RTC keeps time through Wi-Fi drops once it has been set
+            if time_sync.synced:
+                state = await display_CLOCK()
+            else:
+                state = MENU
+        elif state == SETUP:
+            state = await display_SETUP()
 
 if __name__ == "__main__":
     
     # Initialize Display
     collect()
     display = init_Display()
-    #ssid, password = find_WIFI()
-    rtcobj = init_WIFI('O-Block', 'RIPKingVon')
 
     remount("/", False)
     
-    sleep(2)
-    state = MENU
-    
-    while True:
-        if state == MENU:
-            state = display_Menu(display)
-        elif state == NFL or state == NBA or state == MLB or state == NCAAB or state == CFB:
-            state = display_GAMES(display, rtcobj)
-        elif state == CLOCK:
-            if radio.connected:
-                state = asyncio.run(display_CLOCK(display, rtcobj))
-            else:
-                state = MENU
-            
-    remount("/", True)
-    
+    try:
+        asyncio.run(main(display))
+    finally:
+        flush(force=True)
+        remount("/", True)
@@ -0,0 +1,86 @@
+try:
+    from collections import OrderedDict
+except ImportError:
+    OrderedDict = dict
+
+# Team color selection.
+#
+# Each team has a main and an alternate color (ints, parsed once when the game
+# record is built). best_pair() picks the home/away combination that is
+# bright enough to read on the panel and most alike without clashing, all in
+# integer math. The same matchups come round all season, so results are kept
+# per (league, home, away) in a small LRU cache.
+#
+# palette.py, if present, maps known teams to colors tuned for the panel and
+# takes precedence over the feed; tools/build_palette.py generates it.
+
+try:
+    from palette import TEAMS
+except ImportError:
+    TEAMS = {}
+
+WHITE = 0xFFFFFF
+
+# Luma on a 0-255 scale, times 1000 (ITU-R 601 weights)
+MIN_BRIGHTNESS = 50 * 1000
+# Euclidean RGB distance, squared
+MIN_DISTANCE = 100 * 100
+
+CACHE_SIZE = 32
+
+# (league, home, away) -> ((home main, home alt, away main, away alt), pair)
+_cache = OrderedDict()
+
+
+def brightness(color):
+    return ((color >> 16) * 299 + ((color >> 8) & 0xFF) * 587 + (color & 0xFF) * 114)
+
+
+def distance2(a, b):
+    dr = (a >> 16) - (b >> 16)
+    dg = ((a >> 8) & 0xFF) - ((b >> 8) & 0xFF)
+    db = (a & 0xFF) - (b & 0xFF)
+    return dr * dr + dg * dg + db * db
+
+
+def best_pair(home_main, home_alt, away_main, away_alt):
+    """(home, away) colors: the closest pair that is at least MIN_DISTANCE
+    apart with both colors bright enough, white on white when none is."""
+    best = None
+    best_distance = None
+    for away in (away_main, away_alt):
+        if brightness(away) < MIN_BRIGHTNESS:
+            continue
+        for home in (home_main, home_alt):
+            if brightness(home) < MIN_BRIGHTNESS:
+                continue
+            distance = distance2(away, home)
+            if distance < MIN_DISTANCE:
+                continue
+            if best is None or distance < best_distance:
+                best_distance = distance
+                best = (home, away)
+    if best is None:
+        return WHITE, WHITE
+    return best
+
+
+def team_colors(league, game):
+    """(home, away) label colors for a records.Game of league."""
+    home, away = game["HOME"], game["AWAY"]
+    colors = game.colors()
+    teams = TEAMS.get(league)
+    if teams:
+        home_tuned = teams.get(home)
+        away_tuned = teams.get(away)
+        if home_tuned is not None or away_tuned is not None:
+            colors = (home_tuned or colors[:2]) + (away_tuned or colors[2:])
+    key = (league, home, away)
+    hit = _cache.pop(key, None)
+    if hit is None or hit[0] != colors:
+        hit = (colors, best_pair(*colors))
+        if len(_cache) >= CACHE_SIZE:
+            del _cache[next(iter(_cache))]
+    # Most recently used last
+    _cache[key] = hit
+    return hit[1]
@@ -0,0 +1,249 @@
+import asyncio
+import struct
+from binascii import crc32
+
+# Wi-Fi connection manager.
+#
+# Known networks live in microcontroller.nvm, most recently used first, each
+# with the BSSID and channel of the access point it last joined. Reconnecting
+# tries that access point directly (no scan, so it takes a fraction of a
+# second); when that fails a scan ranks every visible known network by signal
+# and tries them strongest first. Only networks marked hidden, which never
+# show up in a scan, get a blind connect. Failed rounds back off
+# exponentially, and all of it runs as a background task instead of on the
+# screens.
+#
+# New credentials stay in RAM until they have connected once, so a mistyped
+# password never reaches NVM.
+#
+# NVM layout, little endian:
+#
+#   header   "MWIF", version u8, network count u8, payload crc32 u32
+#   payload  per network: u8 length + SSID, u8 length + password,
+#            BSSID (6 bytes, zeros when unknown), channel u8 (0 when unknown),
+#            flags u8 (bit 0: hidden; not in version 1)
+
+MAGIC = b"MWIF"
+VERSION = 2
+
+_HIDDEN = 0x01
+
+_HEADER = "<4sBBI"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_NO_BSSID = bytes(6)
+
+# Networks remembered; the least recently used is dropped past this
+MAX_NETWORKS = 4
+# Bytes of NVM the networks can take: SSIDs are up to 32 bytes, WPA
+# passphrases up to 64
+_MAX_SIZE = _HEADER_SIZE + MAX_NETWORKS * (1 + 32 + 1 + 64 + 6 + 1 + 1)
+
+# Seconds radio.connect() may take straight to a known access point, and
+# after a scan
+FAST_TIMEOUT = 4
+CONNECT_TIMEOUT = 10
+# Seconds between link checks while connected
+CHECK_INTERVAL = 1
+# Failed rounds back off exponentially between these (seconds)
+MIN_BACKOFF = 5
+MAX_BACKOFF = 300
+
+
+def pack(networks):
+    """NVM bytes for a list of [ssid, password, bssid, channel, hidden]."""
+    payload = bytearray()
+    for ssid, password, bssid, channel, hidden in networks:
+        for text in (ssid, password):
+            data = text.encode("utf-8")
+            payload.append(len(data))
+            payload += data
+        payload += bssid or _NO_BSSID
+        payload.append(channel or 0)
+        payload.append(_HIDDEN if hidden else 0)
+    return struct.pack(_HEADER, MAGIC, VERSION, len(networks), crc32(payload)) + payload
+
+
+def unpack(data):
+    """The networks in NVM bytes, [] when blank or corrupt."""
+    if len(data) < _HEADER_SIZE:
+        return []
+    magic, version, count, crc = struct.unpack_from(_HEADER, data)
+    if magic != MAGIC or not 1 <= version <= VERSION:
+        return []
+    networks = []
+    offset = _HEADER_SIZE
+    try:
+        for _ in range(count):
+            fields = []
+            for _ in range(2):
+                size = data[offset]
+                fields.append(bytes(data[offset + 1:offset + 1 + size]).decode("utf-8"))
+                offset += 1 + size
+            bssid = bytes(data[offset:offset + 6])
+            channel = data[offset + 6]
+            offset += 7
+            flags = 0
+            if version >= 2:
+                flags = data[offset]
+                offset += 1
+            networks.append([fields[0], fields[1], None if bssid == _NO_BSSID else bssid,
+                             channel or None, bool(flags & _HIDDEN)])
+    except (IndexError, UnicodeError):
+        return []
+    if crc32(bytes(data[_HEADER_SIZE:offset])) != crc:
+        return []
+    return networks
+
+
+class Connection:
+    def __init__(self, radio, nvm=None):
+        """nvm is microcontroller.nvm (anything sliceable); None keeps the
+        networks in RAM only."""
+        self._radio = radio
+        self._nvm = nvm
+        self._saved = b""
+        self.networks = []
+        if nvm is not None:
+            self._saved = bytes(nvm[0:min(len(nvm), _MAX_SIZE)])
+            self.networks = unpack(self._saved)
+        self.backoff = MIN_BACKOFF
+        # SSIDs entered but not yet connected to; kept out of NVM
+        self._untested = set()
+        # Rounds failed in a row
+        self.failures = 0
+        # While True nothing is tried (the setup access point is up)
+        self.paused = False
+        # Set when there is something new to try, cutting a backoff short
+        self._retry = asyncio.Event()
+
+    def _save(self):
+        data = pack([network for network in self.networks if network[0] not in self._untested])
+        # NVM is flash; only write what changed
+        if self._nvm is None or self._saved[:len(data)] == data:
+            return
+        if len(data) > len(self._nvm):
+            print("Wi-Fi networks do not fit in NVM")
+            return
+        self._nvm[0:len(data)] = data
+        self._saved = data
+
+    def _find(self, ssid):
+        for network in self.networks:
+            if network[0] == ssid:
+                return network
+        return None
+
+    def verified(self):
+        """True if any known network has connected at least once."""
+        for network in self.networks:
+            if network[0] not in self._untested:
+                return True
+        return False
+
+    def remember(self, ssid, password, hidden=False):
+        """Add or update a network and make it the first one tried. It is
+        saved to NVM once it has connected."""
+        network = self._find(ssid)
+        if network is None:
+            network = [ssid, password, None, None, hidden]
+        else:
+            self.networks.remove(network)
+            if network[1] != password:
+                network[1:4] = [password, None, None]
+            network[4] = hidden
+        self.networks.insert(0, network)
+        del self.networks[MAX_NETWORKS:]
+        self._untested.add(ssid)
+        self.backoff = MIN_BACKOFF
+        self.failures = 0
+        self._retry.set()
+
+    def _connect(self, network, bssid, channel, timeout):
+        ssid, password = network[0], network[1]
+        print("Conn:", ssid)
+        try:
+            if bssid:
+                self._radio.connect(ssid, password, channel=channel, bssid=bssid, timeout=timeout)
+            else:
+                self._radio.connect(ssid, password, timeout=timeout)
+        except (ConnectionError, OSError, ValueError) as e:
+            # ValueError: an SSID or password radio.connect() will not take
+            print("Failure:", e)
+            return False
+        # Remember the access point we got for the next fast reconnect
+        info = self._radio.ap_info
+        if info is not None:
+            bssid, channel = bytes(info.bssid), info.channel
+        if self.networks[0] is not network:
+            self.networks.remove(network)
+            self.networks.insert(0, network)
+        network[2], network[3] = bssid, channel
+        self._untested.discard(ssid)
+        self._save()
+        return True
+
+    async def _scan(self):
+        """[(rssi, network, bssid, channel)] of the visible known networks,
+        strongest first."""
+        found = []
+        try:
+            for seen in self._radio.start_scanning_networks():
+                network = self._find(seen.ssid)
+                if network is not None:
+                    found.append((seen.rssi, network, bytes(seen.bssid), seen.channel))
+                # The scan hands results over as they arrive; let frames in
+                await asyncio.sleep(0)
+        finally:
+            self._radio.stop_scanning_networks()
+        found.sort(key=lambda entry: entry[0], reverse=True)
+        return found
+
+    async def connect(self):
+        """One round: last access point first, then a ranked scan. True when
+        connected."""
+        if not self.networks:
+            return False
+        last = self.networks[0]
+        if last[2] and self._connect(last, last[2], last[3], FAST_TIMEOUT):
+            return True
+        await asyncio.sleep(0)
+        tried = set()
+        for rssi, network, bssid, channel in await self._scan():
+            if network[0] in tried:
+                continue
+            tried.add(network[0])
+            if self._connect(network, bssid, channel, CONNECT_TIMEOUT):
+                return True
+            await asyncio.sleep(0)
+        # Hidden networks never show up in a scan
+        for network in self.networks:
+            if network[4] and network[0] not in tried:
+                if self._connect(network, None, None, CONNECT_TIMEOUT):
+                    return True
+                await asyncio.sleep(0)
+        return False
+
+    async def run(self, on_connect, on_fail=None):
+        """Keep the radio connected to a known network, calling on_connect()
+        after every successful (re)connect and on_fail(failures) after every
+        failed round."""
+        while True:
+            if self._radio.connected or not self.networks or self.paused:
+                await asyncio.sleep(CHECK_INTERVAL)
+                continue
+            self._retry.clear()
+            if await self.connect():
+                self.backoff = MIN_BACKOFF
+                self.failures = 0
+                on_connect()
+                continue
+            self.failures += 1
+            if on_fail is not None:
+                on_fail(self.failures)
+            delay = self.backoff
+            self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+            print("Wi-Fi retry in", delay)
+            try:
+                await asyncio.wait_for(self._retry.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,250 @@
+import json
+
+# Incremental, field-selective JSON parser.
+#
+# parse() walks a JSON document that arrives as an iterable of bytes chunks
+# (e.g. Response.iter_content()) and only builds Python objects for the
+# whitelisted paths. Everything else is skipped byte by byte without being
+# allocated, so peak memory is one chunk plus the fields we keep, no matter
+# how large the ESPN payload is.
+#
+# Paths are dotted strings. A "*" segment matches any object key or array
+# index, a number matches that array index only. A value whose path matches a
+# whole pattern is kept together with everything below it:
+#
+#   "events.*.competitions.0.status"
+#
+# keeps the full status object of the first competition of every event. The
+# result has the same shape as json.loads() would give, minus the skipped
+# fields; array elements that are skipped become None so indexes still line up.
+
+_KEEP = True
+_SKIP = object()
+
+_QUOTE = 0x22
+
+
+def compile_paths(paths):
+    """Turn dotted path patterns into the nested dict trie used by parse()."""
+    trie = {}
+    for path in paths:
+        node = trie
+        segments = path.split(".")
+        for i, segment in enumerate(segments):
+            if segment != "*" and segment.isdigit():
+                segment = int(segment)
+            if i == len(segments) - 1:
+                node[segment] = _KEEP
+            else:
+                child = node.get(segment)
+                if child is None:
+                    child = node[segment] = {}
+                elif child is _KEEP:
+                    break
+                node = child
+    return trie
+
+
+class _Reader:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.buf = b""
+        self.pos = 0
+
+    def fill(self):
+        """Load the next non-empty chunk. Returns False at end of input."""
+        while True:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return False
+            if chunk:
+                self.buf = chunk
+                self.pos = 0
+                return True
+
+    def peek(self):
+        """Return the next non-whitespace byte without consuming it."""
+        while True:
+            buf = self.buf
+            i = self.pos
+            n = len(buf)
+            while i < n:
+                c = buf[i]
+                # Space, tab, CR, LF
+                if c != 0x20 and c != 0x09 and c != 0x0D and c != 0x0A:
+                    break
+                i += 1
+            self.pos = i
+            if i < n:
+                return buf[i]
+            if not self.fill():
+                raise ValueError("truncated JSON")
+
+    def expect(self, byte):
+        if self.peek() != byte:
+            raise ValueError("expected " + chr(byte))
+        self.pos += 1
+
+    def skip_string(self, out):
+        """Consume a string whose opening quote is at self.pos. When out is a
+        list the raw bytes (quotes included) are appended to it."""
+        start = self.pos
+        i = start + 1
+        escaped = False
+        while True:
+            buf = self.buf
+            n = len(buf)
+            while i < n:
+                if escaped:
+                    escaped = False
+                    i += 1
+                    continue
+                q = buf.find(b'"', i)
+                b = buf.find(b"\\", i)
+                if q < 0 and b < 0:
+                    i = n
+                elif b >= 0 and (q < 0 or b < q):
+                    escaped = True
+                    i = b + 1
+                else:
+                    if out is not None:
+                        out.append(buf[start:q + 1])
+                    self.pos = q + 1
+                    return
+            if out is not None:
+                out.append(buf[start:])
+            if not self.fill():
+                raise ValueError("truncated JSON")
+            start = 0
+            i = 0
+
+    def skip_value(self, out=None):
+        """Consume one value of any type, optionally recording its raw bytes."""
+        first = self.peek()
+        if first == _QUOTE:
+            self.skip_string(out)
+            return
+        depth = 0
+        start = self.pos
+        while True:
+            buf = self.buf
+            n = len(buf)
+            i = self.pos
+            while i < n:
+                c = buf[i]
+                if c == _QUOTE:
+                    if out is not None:
+                        out.append(buf[start:i])
+                    self.pos = i
+                    self.skip_string(out)
+                    buf = self.buf
+                    n = len(buf)
+                    i = start = self.pos
+                    continue
+                if c == 0x7B or c == 0x5B:
+                    depth += 1
+                elif c == 0x7D or c == 0x5D:
+                    if depth == 0:
+                        # End of a bare scalar inside a container
+                        break
+                    depth -= 1
+                    if depth == 0:
+                        i += 1
+                        break
+                elif depth == 0 and (c == 0x2C or c <= 0x20):
+                    break
+                i += 1
+            else:
+                if out is not None:
+                    out.append(buf[start:])
+                self.pos = n
+                if not self.fill():
+                    if depth == 0:
+                        return
+                    raise ValueError("truncated JSON")
+                start = 0
+                continue
+            if out is not None:
+                out.append(buf[start:i])
+            self.pos = i
+            return
+
+    def read_value(self):
+        out = []
+        self.skip_value(out)
+        return json.loads(b"".join(out))
+
+    def read_key(self):
+        if self.peek() != _QUOTE:
+            raise ValueError("expected object key")
+        out = []
+        self.skip_string(out)
+        raw = b"".join(out)
+        if b"\\" in raw:
+            return json.loads(raw)
+        return raw[1:-1].decode("utf-8")
+
+
+def _parse(reader, node):
+    if node is None:
+        reader.skip_value()
+        return _SKIP
+    if node is _KEEP:
+        return reader.read_value()
+
+    first = reader.peek()
+    if first == 0x7B:  # {
+        reader.pos += 1
+        result = {}
+        if reader.peek() == 0x7D:
+            reader.pos += 1
+            return result
+        while True:
+            key = reader.read_key()
+            reader.expect(0x3A)  # :
+            child = node.get(key)
+            if child is None:
+                child = node.get("*")
+            value = _parse(reader, child)
+            if value is not _SKIP:
+                result[key] = value
+            c = reader.peek()
+            reader.pos += 1
+            if c == 0x7D:
+                return result
+            if c != 0x2C:
+                raise ValueError("expected , or }")
+    if first == 0x5B:  # [
+        reader.pos += 1
+        result = []
+        if reader.peek() == 0x5D:
+            reader.pos += 1
+            return result
+        index = 0
+        wildcard = node.get("*")
+        while True:
+            child = node.get(index, wildcard)
+            value = _parse(reader, child)
+            result.append(None if value is _SKIP else value)
+            index += 1
+            c = reader.peek()
+            reader.pos += 1
+            if c == 0x5D:
+                # Drop trailing placeholders so len() reflects what was kept
+                while result and result[-1] is None:
+                    result.pop()
+                return result
+            if c != 0x2C:
+                raise ValueError("expected , or ]")
+    # A scalar where a container was expected; it is small, keep it
+    return reader.read_value()
+
+
+def parse(chunks, paths):
+    """Parse the JSON document in chunks, keeping only the given paths.
+
+    paths is either a list of dotted patterns or a trie from compile_paths().
+    """
+    if not isinstance(paths, dict):
+        paths = compile_paths(paths)
+    return _parse(_Reader(chunks), paths)
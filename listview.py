@@ -0,0 +1,49 @@
+# Virtualized list.
+#
+# ListView shows a window of a long list (a 150 game NCAAB slate) through a
+# fixed pool of row labels. The selected item is always on the first row;
+# moving rebinds the rows to the items after it, so a step, a page or a jump
+# costs the same few label updates however long the list is. Row strings are
+# built once per list by the caller, not on every button press.
+
+
+class ListView:
+    def __init__(self, rows, set_text):
+        """rows are the labels, top to bottom; set_text(label, text) updates
+        one and returns whether it changed."""
+        self.rows = rows
+        self._set_text = set_text
+        self.items = ()
+        self.selected = 0
+
+    def bind(self, items, selected=0):
+        """Show items (a list of strings) with items[selected] on top."""
+        self.items = items
+        for i in range(len(self.rows)):
+            row = self.rows[i]
+            row.hidden = i >= len(items)
+            if row.hidden:
+                self._set_text(row, "")
+        self.select(selected)
+
+    def select(self, index):
+        items = self.items
+        if not items:
+            self.selected = 0
+            return
+        index %= len(items)
+        self.selected = index
+        for i in range(min(len(self.rows), len(items))):
+            self._set_text(self.rows[i], items[(index + i) % len(items)])
+
+    def move(self, step):
+        """Select step items down (negative: up), wrapping around."""
+        self.select(self.selected + step)
+
+    def page(self, step):
+        """Move by step screens of rows."""
+        self.select(self.selected + step * len(self.rows))
+
+    def visible(self):
+        """The row labels currently showing an item."""
+        return self.rows[:len(self.items)]
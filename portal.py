@@ -0,0 +1,221 @@
+import asyncio
+from errno import EAGAIN
+from adafruit_ticks import ticks_ms, ticks_diff
+
+# Wi-Fi provisioning server.
+#
+# Serves the credentials form on the access point to several phones at once.
+# Sockets are non-blocking and every wait is an asyncio sleep, so the display
+# and buttons keep running while setup is open. A request is read across as
+# many recv_into() calls as it takes: headers up to the blank line, then the
+# body up to Content-Length.
+
+PORT = 80
+# Clients served at the same time; more wait in the listen backlog
+MAX_CLIENTS = 4
+# Largest request accepted (headers and body)
+MAX_REQUEST = 2048
+# Seconds a client may take to send its request
+CLIENT_TIMEOUT = 10
+# Seconds between checks of a socket that had nothing to offer
+POLL_INTERVAL = 0.05
+
+# %s is a message about the last submission, if it was refused
+FORM = (
+    "<html><body>"
+    "<h2>Enter WiFi Credentials</h2>"
+    "%s"
+    '<form action="/submit" method="post">'
+    'SSID: <input type="text" name="ssid"><br>'
+    'Password: <input type="password" name="password"><br>'
+    '<input type="checkbox" name="hidden" value="1"> Hidden network<br>'
+    '<input type="submit" value="Submit">'
+    "</form>"
+    "</body></html>"
+)
+SAVED = "<html><body><h2>Saved, connecting...</h2></body></html>"
+
+
+def _would_block(error):
+    return error.args and error.args[0] == EAGAIN
+
+
+def _hex(byte):
+    if 0x30 <= byte <= 0x39:
+        return byte - 0x30
+    byte |= 0x20
+    if 0x61 <= byte <= 0x66:
+        return byte - 0x57
+    return -1
+
+
+def url_decode(data):
+    """Decode one application/x-www-form-urlencoded value ('+' and %XX) in a
+    single pass."""
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        c = data[i]
+        if c == 0x2B:  # +
+            out.append(0x20)
+        elif c == 0x25 and i + 2 < n and _hex(data[i + 1]) >= 0 and _hex(data[i + 2]) >= 0:  # %
+            out.append(_hex(data[i + 1]) << 4 | _hex(data[i + 2]))
+            i += 2
+        else:
+            out.append(c)
+        i += 1
+    return out.decode("utf-8")
+
+
+def credentials_error(ssid, password):
+    """Why radio.connect() would refuse ssid and password, None if it
+    would not: SSIDs are 1-32 bytes, WPA passphrases 8-63 (none for an
+    open network)."""
+    if not 1 <= len(ssid.encode("utf-8")) <= 32:
+        return "The SSID must be 1 to 32 bytes."
+    size = len(password.encode("utf-8"))
+    if size and not 8 <= size <= 63:
+        return "The password must be 8 to 63 characters, or empty for an open network."
+    return None
+
+
+def parse_form(body):
+    """Form body bytes to a dict of strings."""
+    fields = {}
+    for pair in bytes(body).split(b"&"):
+        if not pair:
+            continue
+        name, _, value = pair.partition(b"=")
+        fields[url_decode(name)] = url_decode(value)
+    return fields
+
+
+class Portal:
+    def __init__(self, pool, port=PORT):
+        self._pool = pool
+        self._port = port
+        self._clients = 0
+        self.credentials = None
+
+    async def serve(self):
+        """Serve the form until someone submits usable credentials; returns
+        (ssid, password, hidden)."""
+        server = self._pool.socket()
+        # Older socketpools (CircuitPython 8) have no SO_REUSEADDR
+        if hasattr(self._pool, "SO_REUSEADDR"):
+            server.setsockopt(self._pool.SOL_SOCKET, self._pool.SO_REUSEADDR, 1)
+        server.bind(("0.0.0.0", self._port))
+        server.listen(MAX_CLIENTS)
+        server.setblocking(False)
+        try:
+            while self.credentials is None:
+                if self._clients >= MAX_CLIENTS:
+                    await asyncio.sleep(POLL_INTERVAL)
+                    continue
+                try:
+                    client, address = server.accept()
+                except OSError as e:
+                    if not _would_block(e):
+                        print("Portal accept failed:", e)
+                    await asyncio.sleep(POLL_INTERVAL)
+                    continue
+                print("Client connected from", address)
+                self._clients += 1
+                asyncio.create_task(self._handle(client))
+            # Let the last responses go out before the caller stops the AP
+            while self._clients:
+                await asyncio.sleep(POLL_INTERVAL)
+        finally:
+            server.close()
+        return self.credentials
+
+    async def _read_request(self, client):
+        """(method, path, body) of one request, None if the client went
+        away, took too long or sent too much."""
+        buf = bytearray(MAX_REQUEST)
+        view = memoryview(buf)
+        size = 0
+        head_end = -1
+        length = 0
+        start = ticks_ms()
+        while True:
+            if head_end < 0:
+                head_end = buf.find(b"\r\n\r\n", 0, size)
+                if head_end >= 0:
+                    length = self._content_length(buf[:head_end])
+                    if head_end + 4 + length > MAX_REQUEST:
+                        return None
+            if head_end >= 0 and size >= head_end + 4 + length:
+                break
+            if size == MAX_REQUEST or ticks_diff(ticks_ms(), start) > CLIENT_TIMEOUT * 1000:
+                return None
+            try:
+                count = client.recv_into(view[size:])
+            except OSError as e:
+                if not _would_block(e):
+                    return None
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            if count == 0:
+                return None
+            size += count
+        line_end = buf.find(b"\r\n")
+        parts = bytes(buf[:line_end]).split(b" ")
+        if len(parts) < 2:
+            return None
+        body = buf[head_end + 4:head_end + 4 + length]
+        return parts[0], parts[1], body
+
+    def _content_length(self, head):
+        for line in bytes(head).split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                try:
+                    return int(value.strip())
+                except ValueError:
+                    return 0
+        return 0
+
+    async def _send(self, client, status, page):
+        data = ("HTTP/1.1 %s\r\nContent-Type: text/html\r\nContent-Length: %d\r\n"
+                "Connection: close\r\n\r\n%s" % (status, len(page), page)).encode("utf-8")
+        view = memoryview(data)
+        sent = 0
+        start = ticks_ms()
+        while sent < len(data) and ticks_diff(ticks_ms(), start) < CLIENT_TIMEOUT * 1000:
+            try:
+                sent += client.send(view[sent:])
+            except OSError as e:
+                if not _would_block(e):
+                    return
+                await asyncio.sleep(POLL_INTERVAL)
+
+    async def _handle(self, client):
+        try:
+            client.setblocking(False)
+            request = await self._read_request(client)
+            if request is None:
+                return
+            method, path, body = request
+            message = ""
+            if method == b"POST" and path == b"/submit":
+                try:
+                    fields = parse_form(body)
+                except UnicodeError:
+                    # Not UTF-8 once decoded; ask again
+                    fields = {}
+                ssid = fields.get("ssid", "")
+                password = fields.get("password", "")
+                error = credentials_error(ssid, password)
+                if error is None:
+                    await self._send(client, "200 OK", SAVED)
+                    self.credentials = (ssid, password, fields.get("hidden") == "1")
+                    return
+                message = "<p>%s</p>" % error
+            await self._send(client, "200 OK", FORM % message)
+        except OSError as e:
+            print("Portal client error:", e)
+        finally:
+            client.close()
+            self._clients -= 1
@@ -0,0 +1,266 @@
+from array import array
+import gc
+
+# Compact game record.
+#
+# A plain dict with 15 string keys costs a hash table plus a string object per
+# color and score for every game, which adds up on a 150 game NCAAB slate.
+# Game keeps the same dict-style interface the views use (game["HOME_SCORE"],
+# game.get("ID"), iteration over keys) but stores:
+#
+#   _strs  event id, team abbreviations and status detail, with team names
+#          shared between every record that mentions the team
+#   _nums  one array of 32-bit ints: four colors, two scores, the period,
+#          a bit field for finished/bases/count/state/inning half/note, the
+#          digest, the game clock in seconds and the start time
+#   _keys  the tuple of keys this league uses, shared by all its records
+#
+# MicroPython ignores __slots__, so the saving comes from the packing, not
+# from the slots declaration; on CPython both apply.
+
+_STR = 0
+_COLOR = 1
+_SCORE = 2
+_INT = 3
+_FLAG = 4
+_COUNT = 5
+_STATE = 6
+_HALF = 7
+_NOTE = 8
+
+# ESPN status.type.state values, stored as a 2-bit code
+STATES = ("pre", "in", "post")
+# Baseball inning half, decoded from the first word of status.type.shortDetail
+HALVES = ("top", "mid", "bot", "end")
+# Games that are not simply scheduled, playing or over, from ESPN's
+# status.type.name; None for every other status
+NOTES = (None, "postponed", "delayed", "suspended", "canceled", "forfeit")
+_NOTE_CODES = {
+    "STATUS_POSTPONED": 1,
+    "STATUS_DELAYED": 2,
+    "STATUS_RAIN_DELAY": 2,
+    "STATUS_SUSPENDED": 3,
+    "STATUS_CANCELED": 4,
+    "STATUS_FORFEIT": 5,
+}
+
+# _nums layout
+_HOME_MAIN = 0
+_HOME_ALT = 1
+_AWAY_MAIN = 2
+_AWAY_ALT = 3
+_HOME_SCORE = 4
+_AWAY_SCORE = 5
+_PERIOD = 6
+_BITS = 7
+_DIGEST = 8
+_CLOCK = 9
+_START = 10
+_NUMS = 11
+
+# key: (kind, index into _strs or _nums, bit mask or shift)
+_FIELDS = {
+    "ID": (_STR, 0, 0),
+    "HOME": (_STR, 1, 0),
+    "AWAY": (_STR, 2, 0),
+    "INNING": (_STR, 3, 0),
+    "HOME_COLOR_MAIN": (_COLOR, _HOME_MAIN, 0),
+    "HOME_COLOR_ALT": (_COLOR, _HOME_ALT, 0),
+    "AWAY_COLOR_MAIN": (_COLOR, _AWAY_MAIN, 0),
+    "AWAY_COLOR_ALT": (_COLOR, _AWAY_ALT, 0),
+    "HOME_SCORE": (_SCORE, _HOME_SCORE, 0),
+    "AWAY_SCORE": (_SCORE, _AWAY_SCORE, 0),
+    "QUARTER": (_INT, _PERIOD, 0),
+    "DIGEST": (_INT, _DIGEST, 0),
+    "FINISHED": (_FLAG, _BITS, 0x01),
+    "ON_FIRST": (_FLAG, _BITS, 0x02),
+    "ON_SECOND": (_FLAG, _BITS, 0x04),
+    "ON_THIRD": (_FLAG, _BITS, 0x08),
+    # Three bits each, starting at bit 4
+    "BALLS": (_COUNT, _BITS, 4),
+    "STRIKES": (_COUNT, _BITS, 7),
+    "OUTS": (_COUNT, _BITS, 10),
+    # Two bits at bit 13
+    "STATE": (_STATE, _BITS, 13),
+    "CLOCK": (_INT, _CLOCK, 0),
+    "START": (_INT, _START, 0),
+    # Two bits at bit 15
+    "HALF": (_HALF, _BITS, 15),
+    # Three bits at bit 17
+    "NOTE": (_NOTE, _BITS, 17),
+}
+
+_ZEROS = (0,) * _NUMS
+
+# Every key a record can carry, in a fixed order. Binary snapshots store keys
+# as indexes into this tuple, so only ever append to it.
+FIELD_ORDER = (
+    "ID", "HOME", "AWAY", "INNING",
+    "HOME_COLOR_MAIN", "HOME_COLOR_ALT", "AWAY_COLOR_MAIN", "AWAY_COLOR_ALT",
+    "HOME_SCORE", "AWAY_SCORE", "QUARTER", "DIGEST",
+    "FINISHED", "ON_FIRST", "ON_SECOND", "ON_THIRD",
+    "BALLS", "STRIKES", "OUTS", "STATE",
+    "CLOCK", "START", "HALF", "NOTE",
+)
+NUM_FIELDS = _NUMS
+STR_FIELDS = 4
+
+# Scores that are not a number ("N/A" before kickoff) are stored as this
+_NO_SCORE = -1
+
+# One string object per team abbreviation, shared by all records
+_names = {}
+# One keys tuple per distinct key set, for records loaded from snapshots
+_key_sets = {}
+
+
+def _shared(text):
+    return _names.setdefault(text, text)
+
+
+def _color(value):
+    """ESPN hex color string ("ffb612") to an int, black when malformed."""
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value.lstrip("#"), 16) & 0xFFFFFF
+    except (AttributeError, ValueError):
+        return 0
+
+
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    # The game clock comes as a float ("clock": 300.0)
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+class Game:
+    __slots__ = ("_keys", "_strs", "_nums")
+
+    def __init__(self, keys):
+        self._keys = keys
+        self._strs = [None, "", "", ""]
+        self._nums = array("l", _ZEROS)
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        kind, index, extra = _FIELDS[key]
+        if kind == _STR:
+            return self._strs[index]
+        value = self._nums[index]
+        if kind == _COLOR:
+            return "%06x" % value
+        if kind == _SCORE:
+            return "N/A" if value == _NO_SCORE else str(value)
+        if kind == _INT:
+            return value
+        if kind == _FLAG:
+            return bool(value & extra)
+        if kind == _STATE:
+            return STATES[(value >> extra) & 0x03]
+        if kind == _HALF:
+            return HALVES[(value >> extra) & 0x03]
+        if kind == _NOTE:
+            return NOTES[(value >> extra) & 0x07]
+        return (value >> extra) & 0x07
+
+    def __setitem__(self, key, value):
+        kind, index, extra = _FIELDS[key]
+        nums = self._nums
+        if kind == _STR:
+            if index == 1 or index == 2:
+                value = _shared(value)
+            self._strs[index] = value
+        elif kind == _COLOR:
+            nums[index] = _color(value)
+        elif kind == _SCORE:
+            nums[index] = _to_int(value, _NO_SCORE)
+        elif kind == _INT:
+            nums[index] = _to_int(value, 0)
+        elif kind == _FLAG:
+            if value:
+                nums[index] |= extra
+            else:
+                nums[index] &= ~extra
+        elif kind == _STATE:
+            code = STATES.index(value) if value in STATES else 0
+            nums[index] = (nums[index] & ~(0x03 << extra)) | (code << extra)
+        elif kind == _HALF:
+            # "Top 3rd", "Bot 9th"; anything else counts as the top
+            word = value[:3].lower() if isinstance(value, str) else value
+            code = HALVES.index(word) if word in HALVES else 0
+            nums[index] = (nums[index] & ~(0x03 << extra)) | (code << extra)
+        elif kind == _NOTE:
+            # "STATUS_POSTPONED"; a note read back from a snapshot is already
+            # decoded
+            code = NOTES.index(value) if value in NOTES else _NOTE_CODES.get(value, 0)
+            nums[index] = (nums[index] & ~(0x07 << extra)) | (code << extra)
+        else:
+            count = min(_to_int(value, 0), 7)
+            nums[index] = (nums[index] & ~(0x07 << extra)) | (count << extra)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        return self._keys
+
+    def get(self, key, default=None):
+        if key in self._keys:
+            return self[key]
+        return default
+
+    def colors(self):
+        """(home main, home alt, away main, away alt) as 0xRRGGBB ints."""
+        nums = self._nums
+        return (nums[_HOME_MAIN], nums[_HOME_ALT], nums[_AWAY_MAIN], nums[_AWAY_ALT])
+
+    def to_dict(self):
+        return {key: self[key] for key in self._keys}
+
+    def raw(self):
+        """The packed (strings, ints) behind this record."""
+        return self._strs, self._nums
+
+    @classmethod
+    def from_raw(cls, keys, strs, nums):
+        game = cls(_key_sets.setdefault(keys, keys))
+        game._strs = [strs[0], _shared(strs[1]), _shared(strs[2]), strs[3]]
+        game._nums = array("l", nums)
+        return game
+
+    @classmethod
+    def from_dict(cls, values):
+        keys = tuple(key for key in values if key in _FIELDS)
+        keys = _key_sets.setdefault(keys, keys)
+        game = cls(keys)
+        for key in keys:
+            game[key] = values[key]
+        return game
+
+
+def record_bytes(game, count=20):
+    """Heap bytes per record, measured by copying game count times.
+
+    Only meaningful on CircuitPython, where gc.mem_alloc() exists.
+    """
+    copies = [None] * count
+    gc.collect()
+    before = gc.mem_alloc()
+    for i in range(count):
+        copies[i] = Game.from_dict(game)
+    gc.collect()
+    return (gc.mem_alloc() - before) // count
@@ -0,0 +1,141 @@
+import asyncio
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+# Frame scheduler.
+#
+# Screens and tasks never call display.refresh() themselves. They invalidate()
+# what they changed, and run() pushes at most one refresh per frame at the
+# target frame rate, covering every change made since the last frame. A burst
+# of label updates after a poll therefore costs one refresh, not one per
+# label.
+#
+# Invalidated layers are unioned into one dirty rectangle per frame. displayio
+# tracks its own dirty areas, so the rectangle doesn't limit what is drawn;
+# it feeds the statistics used to tune the panel: frames drawn, frames that
+# started late (the loop was blocked), refresh time and how much of the panel
+# changed.
+
+
+class Renderer:
+    def __init__(self, width=64, height=32, frame_rate=20):
+        self.width = width
+        self.height = height
+        self.frame_rate = frame_rate
+        # ScrollingLabels advanced every frame
+        self.animated = ()
+        self._dirty = None
+        self._positions = ()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.late = 0
+        self.idle = 0
+        self.last_ms = 0
+        self.max_ms = 0
+        self.total_ms = 0
+        self.last_area = 0
+        self.total_area = 0
+
+    def _bounds(self, layer):
+        """(x0, y0, x1, y1) a layer covers on the panel, the whole panel when
+        that can't be told."""
+        if layer is None:
+            return 0, 0, self.width, self.height
+        box = getattr(layer, "bounding_box", None)
+        if box is not None:
+            # Labels: box is local and unscaled
+            scale = getattr(layer, "scale", 1)
+            x = layer.x + box[0] * scale
+            y = layer.y + box[1] * scale
+            return x, y, x + box[2] * scale, y + box[3] * scale
+        tile_width = getattr(layer, "tile_width", None)
+        if tile_width is not None:
+            return (layer.x, layer.y, layer.x + tile_width * layer.width,
+                    layer.y + layer.tile_height * layer.height)
+        return 0, 0, self.width, self.height
+
+    def invalidate(self, layer=None):
+        """Schedule a frame that shows layer's changes (None: everything).
+        Call it before and after a change that can shrink or move a layer."""
+        x0, y0, x1, y1 = self._bounds(layer)
+        self.invalidate_rect((max(0, x0), max(0, y0), min(self.width, x1), min(self.height, y1)))
+
+    def invalidate_rect(self, rect):
+        """Add rect (x0, y0, x1, y1) to this frame's dirty area. An empty rect
+        (e.g. a label whose text was cleared) still schedules a frame."""
+        dirty = self._dirty
+        if dirty is None or dirty[2] <= dirty[0] or dirty[3] <= dirty[1]:
+            self._dirty = rect
+        elif rect[2] > rect[0] and rect[3] > rect[1]:
+            self._dirty = (min(rect[0], dirty[0]), min(rect[1], dirty[1]),
+                           max(rect[2], dirty[2]), max(rect[3], dirty[3]))
+
+    def animate(self, labels):
+        """Scroll labels every frame from now on; the same labels again
+        leave the animation alone."""
+        animated = self.animated
+        if len(labels) == len(animated) and all(labels[i] is animated[i] for i in range(len(labels))):
+            return
+        self.animated = labels
+        self._positions = [None] * len(labels)
+
+    def _advance(self):
+        positions = self._positions
+        for i in range(len(self.animated)):
+            label = self.animated[i]
+            label.update()
+            position = getattr(label, "current_index", None)
+            if position is None or position != positions[i]:
+                positions[i] = position
+                self.invalidate(label)
+
+    def frame(self, display):
+        """Advance animations and refresh display once if anything changed.
+        Returns True when a frame was drawn."""
+        self._advance()
+        dirty = self._dirty
+        if dirty is None:
+            self.idle += 1
+            return False
+        self._dirty = None
+        start = ticks_ms()
+        display.refresh()
+        elapsed = ticks_diff(ticks_ms(), start)
+        area = max(0, dirty[2] - dirty[0]) * max(0, dirty[3] - dirty[1])
+        self.frames += 1
+        self.last_ms = elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+        self.total_ms += elapsed
+        self.last_area = area
+        self.total_area += area
+        return True
+
+    def stats(self):
+        frames = self.frames or 1
+        return {
+            "frames": self.frames,
+            "late": self.late,
+            "idle": self.idle,
+            "last_ms": self.last_ms,
+            "max_ms": self.max_ms,
+            "avg_ms": self.total_ms / frames,
+            "last_area": self.last_area,
+            "avg_area": self.total_area / frames,
+            "panel_area": self.width * self.height,
+        }
+
+    async def run(self, display):
+        """Draw frames at frame_rate forever."""
+        period = 1000 // self.frame_rate
+        due = ticks_ms()
+        while True:
+            self.frame(display)
+            due = ticks_add(due, period)
+            wait = ticks_diff(due, ticks_ms())
+            if wait < 0:
+                # Fell behind (a blocking fetch); don't try to catch up
+                self.late += 1
+                due = ticks_ms()
+                wait = 0
+            await asyncio.sleep(wait / 1000)
@@ -0,0 +1,56 @@
+from displayio import Group
+
+# Retained scene graph.
+#
+# Each screen is a Scene: a Group plus named references to the widgets in
+# it, built once by its builder the first time it is shown and kept in the
+# Stage's pool afterwards. Showing a screen swaps the scene group into the
+# root group; the view then rebinds the widgets (text, colors, tiles) to the
+# game on display instead of constructing new ones, so navigating allocates
+# nothing.
+#
+# The root group is [scene, overlay]. The overlay holds layers every screen
+# shows on top (the Wi-Fi and API icons), so they never move between groups.
+
+
+class Scene:
+    def __init__(self):
+        self.group = Group()
+
+    def add(self, name, layer):
+        """Append layer to the scene and make it available as scene.<name>."""
+        setattr(self, name, layer)
+        self.group.append(layer)
+        return layer
+
+
+class Stage:
+    def __init__(self, display, overlay=()):
+        self.overlay = Group()
+        for layer in overlay:
+            self.overlay.append(layer)
+        self.root = Group()
+        self.root.append(Group())
+        self.root.append(self.overlay)
+        self.current = None
+        self._builders = {}
+        self._scenes = {}
+        display.show(self.root)
+
+    def register(self, name, builder):
+        """builder() returns the Scene for name; it runs on first show()."""
+        self._builders[name] = builder
+
+    def scene(self, name):
+        scene = self._scenes.get(name)
+        if scene is None:
+            scene = self._scenes[name] = self._builders[name]()
+        return scene
+
+    def show(self, name):
+        """Put scene name on the display and return it."""
+        scene = self.scene(name)
+        if self.current is not scene:
+            self.root[0] = scene.group
+            self.current = scene
+        return scene
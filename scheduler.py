@@ -0,0 +1,81 @@
+from random import random
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+from status import is_live
+
+# Poll intervals in seconds, picked from the state of the games being watched
+CLOSING = 10        # a live game is in its final period (or overtime)
+LIVE = 20           # at least one game is in progress
+SCHEDULED = 300     # nothing live yet, games still to start
+# Nothing live and nothing scheduled: polling pauses (interval None)
+
+# Up to this fraction of the interval is added at random to every poll, so
+# several devices (or leagues) don't hit the API in lockstep
+JITTER = 0.1
+
+# Failed polls back off exponentially from the current interval up to this
+MAX_BACKOFF = 600
+
+
+def interval_for(games, final_period, focus_id=None):
+    """Seconds until the next poll for games, or None to pause.
+
+    With focus_id only that game counts (a detail view); otherwise the most
+    urgent game on the slate decides.
+    """
+    scheduled = False
+    live = False
+    for game in games:
+        if focus_id is not None and game.get("ID") != focus_id:
+            continue
+        if is_live(game):
+            if game.get("QUARTER", 0) >= final_period:
+                return CLOSING
+            live = True
+        elif game.get("STATE") == "pre":
+            scheduled = True
+    if live:
+        return LIVE
+    if scheduled:
+        return SCHEDULED
+    return None
+
+
+class PollScheduler:
+    """Tracks the next due time of one polling loop.
+
+    due() reports True exactly once per scheduled time; after that nothing is
+    due until schedule(), succeeded() or failed() sets the next time.
+    """
+
+    def __init__(self):
+        self._due = None
+        self._failures = 0
+        self.interval = None
+
+    def schedule(self, interval, delay=None):
+        """Next poll interval seconds from now (or after delay seconds), plus
+        jitter. None pauses."""
+        self.interval = interval
+        if interval is None:
+            self._due = None
+            return
+        if delay is None:
+            delay = interval
+        delay += interval * JITTER * random()
+        self._due = ticks_add(ticks_ms(), int(delay * 1000))
+
+    def due(self):
+        if self._due is None or ticks_diff(ticks_ms(), self._due) < 0:
+            return False
+        self._due = None
+        return True
+
+    def succeeded(self, interval):
+        self._failures = 0
+        self.schedule(interval)
+
+    def failed(self):
+        """Retry after the current interval doubled per consecutive failure."""
+        self._failures += 1
+        base = self.interval or LIVE
+        self.schedule(base, min(base * (1 << min(self._failures, 6)), MAX_BACKOFF))
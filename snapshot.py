@@ -0,0 +1,209 @@
+import os
+import struct
+from binascii import crc32
+from adafruit_ticks import ticks_ms, ticks_diff
+from records import Game, FIELD_ORDER, NUM_FIELDS, STR_FIELDS
+
+# Binary scoreboard snapshots for offline start-up.
+#
+# Layout, all little endian:
+#
+#   header   "MSNP", version u8, key count u8, game count u16,
+#            string table offset u32
+#   keys     one u8 per key: its index in records.FIELD_ORDER
+#   games    fixed width records: NUM_FIELDS int32s followed by STR_FIELDS
+#            u16 offsets into the string table (0xffff for None)
+#   strings  u8 length + UTF-8 bytes, each distinct string stored once
+#
+# Writes are write-behind: store() keeps the latest games in RAM and flush()
+# writes them out at most once per FLUSH_INTERVAL (or immediately when
+# forced, e.g. on league change or shutdown). A write goes to a temp file
+# that is then renamed over the old snapshot, and is skipped entirely when
+# the packed bytes match what is already on flash.
+#
+# load() reads the whole file with a single readinto() into a buffer sized
+# from os.stat() and decodes a game only when it is first indexed.
+
+MAGIC = b"MSNP"
+VERSION = 2
+
+_HEADER = "<4sBBHI"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_NUMS = "<%dl" % NUM_FIELDS
+_STRS = "<%dH" % STR_FIELDS
+_NUMS_SIZE = struct.calcsize(_NUMS)
+_RECORD_SIZE = _NUMS_SIZE + struct.calcsize(_STRS)
+_NO_STRING = 0xFFFF
+
+# Seconds between flash writes of a snapshot
+FLUSH_INTERVAL = 300
+
+# path -> latest games not yet on flash
+_pending = {}
+# path -> crc32 of the bytes on flash there, from the last write or read
+_written = {}
+_last_flush = None
+
+
+def pack(games):
+    """Serialize a list of records.Game sharing one key set to bytes."""
+    keys = games[0].keys() if games else ()
+    key_ids = bytes([FIELD_ORDER.index(key) for key in keys])
+
+    table = bytearray()
+    offsets = {}
+
+    def string_ref(text):
+        if text is None:
+            return _NO_STRING
+        offset = offsets.get(text)
+        if offset is None:
+            data = text.encode("utf-8")[:255]
+            offset = offsets[text] = len(table)
+            table.append(len(data))
+            table.extend(data)
+        return offset
+
+    records_start = _HEADER_SIZE + len(key_ids)
+    table_start = records_start + _RECORD_SIZE * len(games)
+    out = bytearray(table_start)
+    struct.pack_into(_HEADER, out, 0, MAGIC, VERSION, len(key_ids), len(games), table_start)
+    out[_HEADER_SIZE:records_start] = key_ids
+
+    offset = records_start
+    for game in games:
+        strs, nums = game.raw()
+        struct.pack_into(_NUMS, out, offset, *nums)
+        struct.pack_into(_STRS, out, offset + _NUMS_SIZE, *[string_ref(text) for text in strs])
+        offset += _RECORD_SIZE
+    if len(table) > _NO_STRING:
+        raise ValueError("snapshot string table too large")
+    out.extend(table)
+    return out
+
+
+def _file_crc(path):
+    """crc32 of the file at path, None when there is none."""
+    buf = bytearray(512)
+    view = memoryview(buf)
+    crc = 0
+    try:
+        with open(path, "rb") as f:
+            while True:
+                count = f.readinto(buf)
+                if not count:
+                    return crc
+                crc = crc32(view[:count], crc)
+    except OSError:
+        return None
+
+
+def save(path, games):
+    """Write games to path now, atomically. Returns False when the file
+    already holds exactly these bytes and nothing was written."""
+    data = pack(games)
+    checksum = crc32(data)
+    if path not in _written:
+        # First write since boot: the file may already hold these bytes
+        _written[path] = _file_crc(path)
+    if _written[path] == checksum:
+        return False
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    # FAT can't rename over an existing file; load() falls back to the temp
+    # file if we lose power between these two calls.
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    os.rename(temp, path)
+    _written[path] = checksum
+    return True
+
+
+def store(path, games):
+    """Remember games as the latest snapshot for path; flush() persists it."""
+    _pending[path] = games
+
+
+def pending(path):
+    """Games stored for path but not flushed yet, or None."""
+    return _pending.get(path)
+
+
+def flush(force=False):
+    """Write out stored snapshots if FLUSH_INTERVAL has passed since the last
+    flush, or right away when force is set."""
+    global _last_flush
+    now = ticks_ms()
+    if not force and _last_flush is not None and ticks_diff(now, _last_flush) < FLUSH_INTERVAL * 1000:
+        return
+    _last_flush = now
+    for path in list(_pending):
+        try:
+            save(path, _pending[path])
+        except OSError as e:
+            # Read-only filesystem (USB attached) or flash full; try next time
+            print("Snapshot write failed:", e)
+            continue
+        del _pending[path]
+
+
+class Snapshot:
+    """Read-only, list-like view of a packed snapshot. Games are decoded into
+    records.Game on first access and kept."""
+
+    def __init__(self, buf):
+        magic, version, key_count, count, table = struct.unpack_from(_HEADER, buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("unsupported snapshot")
+        self._buf = buf
+        self._keys = tuple(FIELD_ORDER[i] for i in buf[_HEADER_SIZE:_HEADER_SIZE + key_count])
+        self._records = _HEADER_SIZE + key_count
+        self._table = table
+        self._games = [None] * count
+
+    def __len__(self):
+        return len(self._games)
+
+    def __getitem__(self, index):
+        game = self._games[index]
+        if game is None:
+            if index < 0:
+                index += len(self._games)
+            game = self._games[index] = self._decode(index)
+        return game
+
+    def __iter__(self):
+        for i in range(len(self._games)):
+            yield self[i]
+
+    def _string(self, offset):
+        if offset == _NO_STRING:
+            return None
+        start = self._table + offset
+        length = self._buf[start]
+        return str(self._buf[start + 1:start + 1 + length], "utf-8")
+
+    def _decode(self, index):
+        offset = self._records + index * _RECORD_SIZE
+        nums = struct.unpack_from(_NUMS, self._buf, offset)
+        strs = [self._string(ref) for ref in struct.unpack_from(_STRS, self._buf, offset + _NUMS_SIZE)]
+        return Game.from_raw(self._keys, strs, nums)
+
+
+def load(path):
+    try:
+        size = os.stat(path)[6]
+        source = path
+    except OSError:
+        source = path + ".tmp"
+        size = os.stat(source)[6]
+    buf = bytearray(size)
+    with open(source, "rb") as f:
+        f.readinto(buf)
+    if source == path:
+        # Lets save() skip rewriting the same bytes after a reboot
+        _written[path] = crc32(buf)
+    return Snapshot(buf)
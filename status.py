@@ -0,0 +1,123 @@
+# Game status engine.
+#
+# ESPN's structured status fields are kept at extraction time instead of the
+# free-text shortDetail: state (pre/in/post), period, game clock in seconds,
+# start time, a note for postponed, delayed and similar games (from
+# status.type.name), and for baseball the inning half, which records.Game
+# decodes once into a 2-bit code. The strings the screens show are formatted from
+# those fields here and cached per game until one of the fields changes, so
+# the render path never parses text.
+
+# Hours to add to UTC for start times; set_utc_offset() keeps it in step
+# with the clock
+utc_offset = -5
+
+# (game id, digest, start) -> display string
+_details = {}
+_DETAILS_SIZE = 64
+
+_HALVES = {"top": "Top", "mid": "Mid", "bot": "Bot", "end": "End"}
+_NOTES = {
+    "postponed": "Postponed",
+    "delayed": "Delayed",
+    "suspended": "Suspended",
+    "canceled": "Canceled",
+    "forfeit": "Forfeit",
+}
+
+
+def set_utc_offset(hours):
+    global utc_offset
+    if hours != utc_offset:
+        utc_offset = hours
+        _details.clear()
+
+
+def is_live(game):
+    return game.get("STATE") == "in"
+
+
+def is_final(game):
+    return game.get("STATE") == "post"
+
+
+def days_from_civil(year, month, day):
+    """Days since 1970-01-01 of a proleptic Gregorian date."""
+    if month <= 2:
+        year -= 1
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def parse_date(text):
+    """ESPN's '2024-07-04T23:05Z' (seconds optional) to Unix seconds, 0 when
+    missing or malformed."""
+    try:
+        days = days_from_civil(int(text[0:4]), int(text[5:7]), int(text[8:10]))
+        seconds = int(text[11:13]) * 3600 + int(text[14:16]) * 60
+        if len(text) > 17 and text[16] == ":":
+            seconds += int(text[17:19])
+    except (TypeError, ValueError, IndexError):
+        return 0
+    return days * 86400 + seconds
+
+
+def ordinal(number):
+    if 10 <= number % 100 <= 20:
+        suffix = "th"
+    else:
+        suffix = ("th", "st", "nd", "rd", "th", "th", "th", "th", "th", "th")[number % 10]
+    return str(number) + suffix
+
+
+def start_time(start):
+    """'7:05 PM' local time of a Unix start time, '' when unknown."""
+    if not start:
+        return ""
+    minutes = (start // 60 + utc_offset * 60) % 1440
+    hour, minute = divmod(minutes, 60)
+    ampm = "PM" if hour >= 12 else "AM"
+    return "%d:%02d %s" % (hour % 12 or 12, minute, ampm)
+
+
+def game_clock(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    return "%d:%02d" % (minutes, seconds)
+
+
+def _format(game):
+    note = game.get("NOTE")
+    if note is not None:
+        return _NOTES[note]
+    state = game.get("STATE")
+    if state == "pre":
+        return start_time(game.get("START", 0))
+    if state == "post":
+        # Over without being completed, under a status we do not know
+        return "Final" if game.get("FINISHED", True) else "Ended"
+    period = game.get("QUARTER", 0)
+    half = game.get("HALF")
+    if half is not None:
+        return _HALVES[half] + " " + ordinal(period)
+    return game_clock(game.get("CLOCK", 0))
+
+
+def detail(game):
+    """Status line for game: start time before it, 'Top 3rd' or the game
+    clock during it, 'Final' after; 'Postponed', 'Delayed' and the like
+    whenever ESPN says so."""
+    key = (game.get("ID"), game.get("DIGEST"), game.get("START"))
+    text = _details.get(key)
+    if text is None:
+        if len(_details) >= _DETAILS_SIZE:
+            _details.clear()
+        text = _details[key] = _format(game)
+    return text
+
+
+def bottom_half(game):
+    """True while the home team bats."""
+    return game.get("HALF") == "bot"
@@ -0,0 +1,253 @@
+import asyncio
+import struct
+import time
+from errno import EAGAIN
+from rtc import RTC
+from adafruit_ticks import ticks_ms, ticks_diff
+from status import days_from_civil
+
+# Background NTP time service.
+#
+# The RTC keeps UTC. sync() queries NTP over a non-blocking UDP socket,
+# waiting with asyncio sleeps, and sets the RTC on a whole second so no frame
+# waits on the network. Each sync also measures how far the RTC drifted since
+# the last one; the next sync is scheduled when the drift at that rate would
+# reach MAX_ERROR, so a good crystal gets synced rarely.
+#
+# Local time comes from a rule table for the configured zone: standard offset
+# plus, where the zone observes it, the daylight saving rule. The rule is
+# compiled into the UTC instants of the year's two transitions, so offset()
+# is a comparison or two.
+
+NTP_SERVER = "pool.ntp.org"
+NTP_PORT = 123
+# Seconds from 1900-01-01 (NTP) to 1970-01-01 (Unix)
+NTP_TO_UNIX = 2208988800
+
+# Seconds to wait for an NTP reply
+TIMEOUT = 3
+# Replies that took longer than this (seconds) are not trusted: the half
+# round trip added to the server time is only a guess, and a task that
+# blocked while we waited makes it a bad one
+MAX_ROUND_TRIP = 0.5
+# How far past a whole second (seconds) the RTC may still be set to it
+SET_TOLERANCE = 0.05
+# Seconds between checks of the socket while waiting
+POLL_INTERVAL = 0.05
+# Largest clock error to let build up between syncs, seconds
+MAX_ERROR = 1
+# Sync interval bounds (seconds), and the retry interval after a failure
+MIN_INTERVAL = 3600
+MAX_INTERVAL = 7 * 86400
+RETRY_INTERVAL = 60
+# Seconds between checks for a daylight saving transition
+OFFSET_CHECK = 60
+
+# Daylight saving rules: (month, nth Sunday (-1: last), seconds into the day,
+# True if that time is UTC rather than local) for the start and the end
+US = ((3, 2, 2 * 3600, False), (11, 1, 2 * 3600, False))
+EU = ((3, -1, 3600, True), (10, -1, 3600, True))
+
+# Zone -> (standard offset from UTC in hours, daylight saving rule or None)
+ZONES = {
+    "UTC": (0, None),
+    "US/Eastern": (-5, US),
+    "US/Central": (-6, US),
+    "US/Mountain": (-7, US),
+    "US/Arizona": (-7, None),
+    "US/Pacific": (-8, US),
+    "US/Alaska": (-9, US),
+    "US/Hawaii": (-10, None),
+    "Europe/London": (0, EU),
+    "Europe/Berlin": (1, EU),
+    "Europe/Athens": (2, EU),
+}
+
+
+def _sunday(year, month, nth):
+    """Days since 1970-01-01 of the nth (-1: last) Sunday of a month."""
+    if nth > 0:
+        first = days_from_civil(year, month, 1)
+        # 1970-01-01 was a Thursday; weekday 0 is Sunday
+        return first + (3 - first) % 7 + 7 * (nth - 1)
+    if month == 12:
+        last = days_from_civil(year + 1, 1, 1) - 1
+    else:
+        last = days_from_civil(year, month + 1, 1) - 1
+    return last - (last + 4) % 7
+
+
+def compile_zone(zone, year):
+    """(start, end, standard, daylight) for a zone and year: the UTC seconds
+    daylight saving starts and ends, and the two offsets in seconds. start
+    and end are None where the zone has no daylight saving."""
+    hours, rule = ZONES[zone]
+    standard = int(hours * 3600)
+    if rule is None:
+        return None, None, standard, standard
+    daylight = standard + 3600
+    instants = []
+    for (month, nth, seconds, utc), offset in zip(rule, (standard, daylight)):
+        instant = _sunday(year, month, nth) * 86400 + seconds
+        if not utc:
+            instant -= offset
+        instants.append(instant)
+    return instants[0], instants[1], standard, daylight
+
+
+def _now(reply):
+    """(seconds, milliseconds) of the Unix time now, from a TimeSync._query()
+    reply and the ticks since it arrived."""
+    seconds, millis, received = reply
+    millis += ticks_diff(ticks_ms(), received)
+    return seconds + millis // 1000, millis % 1000
+
+
+class TimeSync:
+    def __init__(self, pool, zone, server=NTP_SERVER, on_offset=None, on_sync=None):
+        """on_offset(hours) is called with the UTC offset whenever it
+        changes (and once at start), on_sync() after every RTC update."""
+        if zone not in ZONES:
+            raise ValueError("Unknown time zone " + zone)
+        self._pool = pool
+        self._zone = zone
+        self._server = server
+        self._address = None
+        self._on_offset = on_offset
+        self.on_sync = on_sync
+        self._rtc = RTC()
+        self._year = None
+        self._rules = None
+        self._offset = None
+        self._wake = asyncio.Event()
+        # RTC time of the last good sync
+        self._synced_at = None
+        self.drift = 0.0
+        self.interval = MIN_INTERVAL
+        self.synced = False
+
+    def offset(self, utc):
+        """Seconds to add to a UTC time for local time."""
+        year = time.localtime(utc).tm_year
+        if year != self._year:
+            self._rules = compile_zone(self._zone, year)
+            self._year = year
+        start, end, standard, daylight = self._rules
+        if start is None:
+            return standard
+        if start < end:
+            return daylight if start <= utc < end else standard
+        # Southern hemisphere: daylight time spans the new year
+        return standard if end <= utc < start else daylight
+
+    def local(self):
+        """struct_time of the local time now."""
+        utc = time.time()
+        return time.localtime(utc + self.offset(utc))
+
+    def request_sync(self):
+        """Sync as soon as possible, e.g. after Wi-Fi comes back."""
+        self._wake.set()
+
+    def _check_offset(self):
+        offset = self.offset(time.time())
+        if offset != self._offset:
+            self._offset = offset
+            if self._on_offset is not None:
+                self._on_offset(offset // 3600 if offset % 3600 == 0 else offset / 3600)
+
+    async def _query(self):
+        """(seconds, milliseconds, ticks) of the Unix time according to the
+        server and ticks_ms() at that time, None on failure. The time stays
+        in ints: a single precision float of today's Unix time is only good
+        to a couple of minutes."""
+        if self._address is None:
+            # DNS is blocking, so look the server up once
+            self._address = self._pool.getaddrinfo(self._server, NTP_PORT)[0][4]
+        packet = bytearray(48)
+        packet[0] = 0x1B  # version 3, client
+        sock = self._pool.socket(self._pool.AF_INET, self._pool.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            sent = ticks_ms()
+            sock.sendto(packet, self._address)
+            while True:
+                try:
+                    size = sock.recv_into(packet)
+                    received = ticks_ms()
+                    break
+                except OSError as e:
+                    if not e.args or e.args[0] != EAGAIN:
+                        raise
+                if ticks_diff(ticks_ms(), sent) > TIMEOUT * 1000:
+                    return None
+                await asyncio.sleep(POLL_INTERVAL)
+        finally:
+            sock.close()
+        round_trip = ticks_diff(received, sent)
+        if size < 48 or round_trip > MAX_ROUND_TRIP * 1000:
+            return None
+        seconds, fraction = struct.unpack_from("!II", packet, 40)
+        if seconds == 0:
+            return None
+        millis = (fraction * 1000 >> 32) + round_trip // 2
+        return seconds - NTP_TO_UNIX + millis // 1000, millis % 1000, received
+
+    async def sync(self):
+        """Set the RTC from NTP and schedule the next sync. True on success."""
+        try:
+            reply = await self._query()
+        except OSError as e:
+            print("NTP failed:", e)
+            self._address = None
+            reply = None
+        if reply is None:
+            self.interval = RETRY_INTERVAL
+            return False
+        # Set the RTC on a whole second. The time is worked out from the
+        # ticks since the reply, not from how long we meant to sleep, since
+        # other tasks can stretch the sleep; a wake too far past the second
+        # waits for the next one.
+        second, millis = _now(reply)
+        tries = 0
+        while millis >= SET_TOLERANCE * 1000 and tries < 5:
+            await asyncio.sleep((1000 - millis) / 1000)
+            second, millis = _now(reply)
+            tries += 1
+        error = second - time.time()
+        if self.synced and self._synced_at is not None:
+            elapsed = second - self._synced_at
+            if elapsed > 0:
+                self.drift = error / elapsed
+        self._rtc.datetime = time.localtime(second)
+        self._synced_at = second
+        if self.drift:
+            interval = int(MAX_ERROR / abs(self.drift))
+        else:
+            interval = MAX_INTERVAL
+        # Grow at most twofold per sync; one good sync proves little
+        interval = min(interval, max(self.interval, MIN_INTERVAL) * 2)
+        self.interval = max(MIN_INTERVAL, min(interval, MAX_INTERVAL))
+        self.synced = True
+        print("NTP: error", error, "s, next sync in", self.interval, "s")
+        if self.on_sync is not None:
+            self.on_sync()
+        return True
+
+    async def run(self):
+        """Sync every interval (sooner on request_sync()) and track daylight
+        saving transitions."""
+        self._check_offset()
+        due = 0
+        while True:
+            if due <= 0 or self._wake.is_set():
+                self._wake.clear()
+                await self.sync()
+                self._check_offset()
+                due = self.interval
+            try:
+                await asyncio.wait_for(self._wake.wait(), min(due, OFFSET_CHECK))
+            except asyncio.TimeoutError:
+                pass
+            due -= OFFSET_CHECK
+            self._check_offset()
@@ -0,0 +1,68 @@
+"""Generate palette.py, the optional table of team colors colors.py uses.
+
+Run on the host (it needs network access) from the repository root:
+
+    python tools/build_palette.py
+
+then copy palette.py to the board next to code.py. Every team ESPN lists
+for the supported leagues gets its main and alternate color as ints, so the
+device neither parses them nor depends on the scoreboard feed for them.
+Edit the generated values by hand to tune colors for the panel.
+"""
+
+import json
+import sys
+from urllib.request import urlopen
+
+OUTPUT = "palette.py"
+
+LEAGUES = {
+    "mlb": "baseball/mlb",
+    "nba": "basketball/nba",
+    "ncaab": "basketball/mens-college-basketball",
+    "nfl": "football/nfl",
+    "cfb": "football/college-football",
+}
+
+URL = "http://site.api.espn.com/apis/site/v2/sports/%s/teams?limit=1000"
+
+
+def color(value):
+    try:
+        return int(value.lstrip("#"), 16) & 0xFFFFFF
+    except (AttributeError, ValueError):
+        return 0
+
+
+def fetch(path):
+    with urlopen(URL % path) as response:
+        data = json.load(response)
+    teams = {}
+    for league in data["sports"][0]["leagues"]:
+        for entry in league["teams"]:
+            team = entry["team"]
+            teams[team["abbreviation"]] = (color(team.get("color")), color(team.get("alternateColor")))
+    return teams
+
+
+def main():
+    lines = [
+        "# Generated by tools/build_palette.py; edit to tune colors for the panel.",
+        "# league -> team abbreviation -> (main, alternate) as 0xRRGGBB",
+        "TEAMS = {",
+    ]
+    for league, path in LEAGUES.items():
+        teams = fetch(path)
+        lines.append("    %r: {" % league)
+        for abbreviation in sorted(teams):
+            main_color, alt_color = teams[abbreviation]
+            lines.append("        %r: (0x%06x, 0x%06x)," % (abbreviation, main_color, alt_color))
+        lines.append("    },")
+        print("%s: %d teams" % (league, len(teams)))
+    lines.append("}")
+    with open(OUTPUT, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Pack the small status icons into one sprite sheet.
+
+Run on the host from the repository root whenever one of the icons changes:
+
+    python tools/pack_sprites.py
+
+Writes bitmaps/sprites.bmp (8-bit indexed) and bitmaps/sprites.json, the
+manifest assets.py reads to find each icon: {name: [tile_width, tile_height,
+tile_index]}. Icons of one size share a band of the sheet. displayio needs a
+TileGrid's tile size to divide the bitmap exactly, so the sheet is sized to a
+common multiple of every icon width and height and each band starts on a
+multiple of its tile height.
+"""
+
+import json
+import os
+import struct
+import sys
+
+SOURCE = "bitmaps"
+SHEET = "bitmaps/sprites.bmp"
+MANIFEST = "bitmaps/sprites.json"
+
+ICONS = (
+    "q1", "q2", "q3", "q4", "ot", "fin",
+    "top_inning", "bottom_inning",
+    "base", "base_loaded",
+)
+
+
+def gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+def lcm(values):
+    result = 1
+    for value in values:
+        result = result * value // gcd(result, value)
+    return result
+
+
+def round_up(value, step):
+    return (value + step - 1) // step * step
+
+
+def read_bmp(path):
+    """Return (width, height, rows of 0xRRGGBB ints, top row first)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] != b"BM":
+        raise ValueError(path + ": not a BMP")
+    offset = struct.unpack_from("<I", data, 10)[0]
+    width, height, _, bpp, compression = struct.unpack_from("<iiHHI", data, 18)
+    if bpp not in (24, 32) or compression not in (0, 3):
+        raise ValueError(path + ": only 24/32-bit uncompressed BMPs are supported")
+    top_down = height < 0
+    height = abs(height)
+    step = bpp // 8
+    stride = round_up(width * step, 4)
+    rows = []
+    for y in range(height):
+        start = offset + stride * (y if top_down else height - 1 - y)
+        row = []
+        for x in range(width):
+            b, g, r = data[start + x * step:start + x * step + 3]
+            row.append((r << 16) | (g << 8) | b)
+        rows.append(row)
+    return width, height, rows
+
+
+def write_bmp(path, width, height, pixels, palette):
+    """Write an 8-bit indexed, bottom-up BMP. pixels is a list of rows."""
+    stride = round_up(width, 4)
+    offset = 14 + 40 + 4 * len(palette)
+    size = offset + stride * height
+    out = bytearray(size)
+    struct.pack_into("<2sIHHI", out, 0, b"BM", size, 0, 0, offset)
+    struct.pack_into("<IiiHHIIiiII", out, 14, 40, width, height, 1, 8, 0,
+                     stride * height, 2835, 2835, len(palette), len(palette))
+    for i, color in enumerate(palette):
+        struct.pack_into("<BBBB", out, 54 + 4 * i, color & 0xFF, (color >> 8) & 0xFF, color >> 16, 0)
+    for y in range(height):
+        start = offset + stride * (height - 1 - y)
+        out[start:start + width] = bytes(pixels[y])
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def pack(names):
+    icons = [(name, read_bmp(os.path.join(SOURCE, name + ".bmp"))) for name in names]
+
+    # One band per tile size, in order of first appearance
+    bands = []
+    for name, (width, height, rows) in icons:
+        for band in bands:
+            if band[0] == (width, height):
+                band[1].append((name, rows))
+                break
+        else:
+            bands.append(((width, height), [(name, rows)]))
+
+    sheet_width = round_up(max(w * len(members) for (w, h), members in bands),
+                           lcm([w for (w, h), members in bands]))
+    placed = []
+    y = 0
+    for (w, h), members in bands:
+        y = round_up(y, h)
+        placed.append((w, h, y, members))
+        y += h
+    sheet_height = round_up(y, lcm([h for (w, h), members in bands]))
+
+    palette = [0x000000]
+    pixels = [[0] * sheet_width for _ in range(sheet_height)]
+    manifest = {}
+    for w, h, top, members in placed:
+        for column, (name, rows) in enumerate(members):
+            left = column * w
+            for dy in range(h):
+                for dx in range(w):
+                    color = rows[dy][dx]
+                    if color not in palette:
+                        palette.append(color)
+                    pixels[top + dy][left + dx] = palette.index(color)
+            index = (top // h) * (sheet_width // w) + left // w
+            manifest[name] = [w, h, index]
+    if len(palette) > 256:
+        raise ValueError("too many colors for an 8-bit sheet")
+    return sheet_width, sheet_height, pixels, palette, manifest
+
+
+def main():
+    width, height, pixels, palette, manifest = pack(ICONS)
+    write_bmp(SHEET, width, height, pixels, palette)
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, sort_keys=True)
+        f.write("\n")
+    print("%s: %dx%d, %d icons, %d colors" % (SHEET, width, height, len(manifest), len(palette)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())